@@ -0,0 +1,72 @@
+import json
+from time import perf_counter
+
+from django.core import serializers
+from django.core.management.base import BaseCommand
+
+from api.serializers import POST
+from posts.models import Post
+
+
+def from_values(limit):
+    return [POST.dump(row) for row in POST.values(Post.objects.all())[:limit]]
+
+
+def from_instances(limit):
+    return [
+        {
+            'id': post.pk,
+            'text': post.text,
+            'pub_date': post.pub_date.isoformat(),
+            'author': post.author.username,
+            'group': post.group.slug if post.group else None,
+            'image': post.image.url if post.image else None,
+        }
+        for post in Post.objects.select_related('author', 'group')[:limit]
+    ]
+
+
+def from_django_serializer(limit):
+    return serializers.serialize('python', Post.objects.all()[:limit])
+
+
+METHODS = (
+    ('values + Serializer', from_values),
+    ('instances + dict', from_instances),
+    ('django.core.serializers', from_django_serializer),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет стоимость сериализации одного поста для API: .values() '
+        'с Serializer против экземпляров моделей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items', type=int, default=1000,
+            help='Сколько постов сериализовать за проход.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Число проходов; берется лучший.')
+
+    def handle(self, *args, **options):
+        items = min(options['items'], Post.objects.count())
+        if not items:
+            self.stdout.write('Нет постов для замера.')
+            return
+        self.stdout.write(f'Постов за проход: {items}')
+        for name, method in METHODS:
+            build, encode = [], []
+            for _ in range(options['repeat']):
+                start = perf_counter()
+                data = method(items)
+                built = perf_counter()
+                json.dumps(data, default=str)
+                build.append(built - start)
+                encode.append(perf_counter() - built)
+            self.stdout.write(
+                f'{name:<24} {min(build) / items * 1e6:8.1f} мкс/пост '
+                f'выборка и словари, {min(encode) / items * 1e6:6.1f} '
+                f'мкс/пост json')
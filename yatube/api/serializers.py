@@ -0,0 +1,86 @@
+from django.conf import settings
+
+
+def isoformat(value):
+    return value.isoformat()
+
+
+def media_url(name):
+    return f'{settings.MEDIA_URL}{name}' if name else None
+
+
+class Serializer:
+    """Сериализатор строк ``.values()`` в словари для JSON.
+
+    ``fields`` — {имя в ответе: (путь для values, преобразование или
+    None)}. Экземпляры моделей не создаются: в запрос попадают только
+    нужные столбцы, а ``dump`` лишь переименовывает и преобразует их.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.lookups = sorted({'pk'} | {
+            lookup for lookup, _ in fields.values()})
+        self._plain = [
+            (name, lookup) for name, (lookup, convert) in fields.items()
+            if convert is None
+        ]
+        self._converted = [
+            (name, lookup, convert)
+            for name, (lookup, convert) in fields.items()
+            if convert is not None
+        ]
+
+    def select(self, names):
+        """Сериализатор только с полями ``names``; пустой — все поля."""
+        if not names:
+            return self
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise ValueError(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.')
+        return Serializer(**{name: self.fields[name] for name in names})
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def dump_object(self, obj):
+        """Словарь из уже загруженного объекта — для полей без ``__``."""
+        return self.dump({
+            lookup: getattr(obj, lookup) for lookup in self.lookups})
+
+    def dump(self, row):
+        data = {name: row[lookup] for name, lookup in self._plain}
+        for name, lookup, convert in self._converted:
+            value = row[lookup]
+            data[name] = None if value is None else convert(value)
+        return data
+
+
+POST = Serializer(
+    id=('pk', None),
+    text=('text', None),
+    pub_date=('pub_date', isoformat),
+    author=('author__username', None),
+    group=('group__slug', None),
+    image=('image', media_url),
+)
+
+COMMENT = Serializer(
+    id=('pk', None),
+    text=('text', None),
+    created=('created', isoformat),
+    author=('author__username', None),
+)
+
+GROUP = Serializer(
+    slug=('slug', None),
+    title=('title', None),
+    description=('description', None),
+)
+
+PROFILE = Serializer(
+    username=('username', None),
+    first_name=('first_name', None),
+    last_name=('last_name', None),
+)
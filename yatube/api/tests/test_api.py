@@ -0,0 +1,122 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='Leo', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'post-{index}', author=cls.author,
+                group=cls.group if index % 2 else None)
+            for index in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text='test-comment')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_pagination(self):
+        """Лента листается курсором по ссылке next."""
+        url = reverse('api:posts') + '?limit=2'
+        texts = []
+        while url:
+            data = self.client.get(url).json()
+            texts.extend(post['text'] for post in data['results'])
+            url = data['next']
+
+        self.assertEqual(
+            texts, [f'post-{index}' for index in reversed(range(5))])
+
+    def test_fields_selection(self):
+        """?fields= оставляет в ответе только выбранные поля."""
+        data = self.client.get(
+            reverse('api:posts'), {'fields': 'id,author'}).json()
+
+        self.assertEqual(
+            data['results'][0], {'id': self.posts[-1].pk, 'author': 'Leo'})
+        self.assertEqual(
+            self.client.get(
+                reverse('api:posts'), {'fields': 'secret'}).status_code,
+            400)
+
+    def test_batch_fetch_by_ids(self):
+        """?ids= возвращает посты в порядке запроса одним запросом."""
+        ids = [self.posts[2].pk, self.posts[0].pk, 999]
+        with self.assertNumQueries(1):
+            data = self.client.get(
+                reverse('api:posts'),
+                {'ids': ','.join(map(str, ids)), 'fields': 'id'}).json()
+
+        self.assertEqual(
+            data['results'], [{'id': ids[0]}, {'id': ids[1]}])
+
+    def test_post_detail_with_comments(self):
+        """Пост отдается вместе с комментариями."""
+        data = self.client.get(reverse(
+            'api:post_detail', kwargs={'post_id': self.posts[0].pk})).json()
+
+        self.assertEqual(data['text'], 'post-0')
+        self.assertIsNone(data['group'])
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']],
+            ['test-comment'])
+
+    def test_group_and_profile(self):
+        """Группа и профиль отдают описание и свои посты."""
+        group = self.client.get(reverse(
+            'api:group_posts', kwargs={'slug': 'test-slug'})).json()
+        profile = self.client.get(reverse(
+            'api:profile', kwargs={'username': 'Leo'})).json()
+
+        self.assertEqual(group['group']['title'], 'test-group')
+        self.assertEqual(len(group['results']), 2)
+        self.assertEqual(profile['author']['first_name'], 'Лев')
+        self.assertEqual(len(profile['results']), 5)
+
+    def test_follow_feed(self):
+        """Лента подписок требует входа."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.author)
+        url = reverse('api:follow_index')
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(follower)
+        self.assertEqual(len(self.client.get(url).json()['results']), 5)
+
+    def test_errors_as_json(self):
+        """Ошибки возвращаются в JSON, запись запрещена."""
+        response = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': 999}))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+        self.assertEqual(
+            self.client.post(reverse('api:posts')).status_code, 405)
+
+    def test_benchmark_command(self):
+        """api_benchmark печатает стоимость сериализации на пост."""
+        out = StringIO()
+        call_command('api_benchmark', items=5, repeat=1, stdout=out)
+
+        self.assertIn('values + Serializer', out.getvalue())
+        self.assertIn('мкс/пост', out.getvalue())
@@ -0,0 +1,125 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from api.serializers import COMMENT, GROUP, POST, PROFILE
+from posts.cache import followed_ids, get_cached_or_404
+from posts.models import Comment, Group, Post, User
+
+MAX_LIMIT = 100
+
+
+def api_view(view):
+    """GET-only view, который возвращает JSON и ошибки в JSON.
+
+    View возвращает словарь; ValueError превращается в 400, Http404 —
+    в 404.
+    """
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            data = view(request, *args, **kwargs)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено.'}, status=404)
+        if isinstance(data, JsonResponse):
+            return data
+        return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+    return wrapper
+
+
+def int_list(value, name):
+    try:
+        return [int(item) for item in value.split(',') if item]
+    except ValueError:
+        raise ValueError(f'{name} — список чисел через запятую.')
+
+
+def post_serializer(request):
+    fields = request.GET.get('fields', '')
+    return POST.select([name for name in fields.split(',') if name])
+
+
+def paginate(request, queryset, serializer):
+    """Страница по курсору: ``?cursor=<id>`` — посты с id меньше.
+
+    Курсор устойчив к новым записям, в отличие от номера страницы, а
+    запрос — диапазон по первичному ключу без OFFSET.
+    """
+    params = request.GET.copy()
+    limit = params.get('limit', str(settings.POSTS_PER_PAGE))
+    cursor = params.get('cursor')
+    if not limit.isdigit() or (cursor and not cursor.isdigit()):
+        raise ValueError('limit и cursor должны быть числами.')
+    limit = min(int(limit), MAX_LIMIT) or 1
+    if cursor:
+        queryset = queryset.filter(pk__lt=int(cursor))
+    rows = list(serializer.values(queryset.order_by('-pk'))[:limit + 1])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        params['cursor'] = rows[-1]['pk']
+        next_url = f'{request.path}?{params.urlencode()}'
+    return {
+        'results': [serializer.dump(row) for row in rows],
+        'next': next_url,
+    }
+
+
+@api_view
+def posts(request):
+    """Общая лента; ``?ids=1,2,3`` — пакетная выборка постов по id."""
+    serializer = post_serializer(request)
+    if 'ids' in request.GET:
+        ids = int_list(request.GET['ids'], 'ids')[:MAX_LIMIT]
+        rows = {
+            row['pk']: row
+            for row in serializer.values(Post.objects.filter(pk__in=ids))
+        }
+        return {
+            'results': [serializer.dump(rows[pk]) for pk in ids if pk in rows]
+        }
+    return paginate(request, Post.objects.all(), serializer)
+
+
+@api_view
+def post_detail(request, post_id):
+    serializer = post_serializer(request)
+    row = serializer.values(Post.objects.filter(pk=post_id)).first()
+    if row is None:
+        raise Http404
+    comments = COMMENT.values(Comment.objects.filter(post_id=post_id))
+    return {
+        **serializer.dump(row),
+        'comments': [COMMENT.dump(comment) for comment in comments],
+    }
+
+
+@api_view
+def group_posts(request, slug):
+    group = get_cached_or_404(Group, slug=slug)
+    return {
+        'group': GROUP.dump_object(group),
+        **paginate(request, group.group_posts.all(), post_serializer(request)),
+    }
+
+
+@api_view
+def profile(request, username):
+    author = get_cached_or_404(User, username=username)
+    return {
+        'author': PROFILE.dump_object(author),
+        **paginate(request, author.posts.all(), post_serializer(request)),
+    }
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Требуется вход.'}, status=403)
+    posts = Post.objects.filter(author_id__in=followed_ids(request.user))
+    return paginate(request, posts, post_serializer(request))
@@ -0,0 +1,190 @@
+import hashlib
+import math
+import random
+import time
+import uuid
+from functools import wraps
+
+from django.core.cache import cache as default_cache
+from django.utils.cache import (
+    get_conditional_response, patch_response_headers, set_response_etag,
+)
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+PAGE_GENERATION_KEY = 'pages:generation'
+
+
+def _fresh(entry, beta):
+    """Вероятностное досрочное истечение (XFetch).
+
+    Чем дольше пересчитывалось значение и чем ближе срок, тем выше шанс,
+    что именно этот вызов решит пересчитать его заранее.
+    """
+    _, delta, expires = entry
+    return time.time() - delta * beta * math.log(1 - random.random()) < expires
+
+
+def _entry(cache, key, beta):
+    """Запись single_flight; истекшая перечитывается из общего кэша.
+
+    Копия в локальном уровне TwoTierCache может пережить пересчет в
+    другом процессе: запись ее не сбрасывает.
+    """
+    entry = cache.get(key)
+    if entry is None or _fresh(entry, beta):
+        return entry
+    return shared_cache(cache).get(key, entry)
+
+
+def single_flight(key, compute, timeout, *, stale_timeout=None, beta=1.0,
+                  cacheable=None, cache=None):
+    """Значение из кэша, которое пересчитывает только один вызов.
+
+    Пересчет защищен блокировкой ``<key>:lock`` в самом кэше. Пока она
+    занята, остальные получают устаревшее значение, а если его нет —
+    ждут результата. Устаревшее значение хранится еще ``stale_timeout``
+    секунд после логического истечения.
+    """
+    cache = cache or default_cache
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    entry = _entry(cache, key, beta)
+    if entry is not None and _fresh(entry, beta):
+        return entry[0]
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            start = time.time()
+            value = compute()
+            finished = time.time()
+            if cacheable is None or cacheable(value):
+                cache.set(
+                    key, (value, finished - start, finished + timeout),
+                    timeout + stale_timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+    if entry is not None:
+        return entry[0]
+    deadline = time.time() + LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if cache.get(lock_key) is None:
+            break
+    return compute()
+
+
+def shared_cache(cache=None):
+    """Общий уровень TwoTierCache — его видят все процессы сразу."""
+    cache = cache or default_cache
+    return getattr(cache, 'shared', cache)
+
+
+def invalidate_copies(keys, cache=None):
+    """Сбрасывает копии перезаписанных ``keys`` в локальных уровнях
+    TwoTierCache всех процессов."""
+    cache = cache or default_cache
+    if hasattr(cache, 'invalidate'):
+        cache.invalidate(keys)
+
+
+def page_generation(cache=None):
+    """Текущее поколение страниц из ``cached_page(versioned=True)``.
+
+    Номер читается мимо локального уровня TwoTierCache: после записи
+    контента все процессы должны сразу перейти на новые ключи.
+    """
+    cache = shared_cache(cache)
+    generation = cache.get(PAGE_GENERATION_KEY)
+    if generation is None:
+        cache.add(PAGE_GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(PAGE_GENERATION_KEY)
+    return generation
+
+
+def bump_page_generation(cache=None):
+    """Переводит версионируемые страницы на новые ключи.
+
+    Номер случайный, а не счетчик: после отката транзакции старый номер
+    не совпадет ни с одним из тех, под которыми уже лежат страницы.
+    """
+    shared_cache(cache).set(
+        PAGE_GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _is_cacheable(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def _with_validators(response):
+    """ETag и Last-Modified, которые сохраняются вместе со страницей."""
+    if _is_cacheable(response):
+        set_response_etag(response)
+        response['Last-Modified'] = http_date()
+    return response
+
+
+def _conditional(request, response, vary_on):
+    """Отвечает 304, если у клиента уже есть эта версия страницы.
+
+    ``vary_on(request)`` описывает то, что меняется в персональных
+    фрагментах; для непустого значения ETag зависит и от него, а
+    Last-Modified не отправляется — по дате такие изменения не видны.
+    """
+    etag = response.get('ETag')
+    if etag is None:
+        return response
+    viewer = vary_on(request) if vary_on else ''
+    if viewer:
+        etag = quote_etag(
+            hashlib.md5(f'{etag}:{viewer}'.encode()).hexdigest())
+        response['ETag'] = etag
+        del response['Last-Modified']
+    last_modified = parse_http_date_safe(response.get('Last-Modified', ''))
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response)
+
+
+def _is_anonymous(request):
+    user = getattr(request, 'user', None)
+    return user is None or not user.is_authenticated
+
+
+def cached_page(timeout, key_prefix='page', versioned=False, vary_on=None,
+                shared=False):
+    """Аналог ``cache_page`` с пересчетом через ``single_flight``.
+
+    Ключ не учитывает сессию, поэтому по умолчанию кэш работает только
+    для анонимных запросов, а вошедшие пользователи получают страницу
+    из view. С ``shared`` страница общая для всех: персональные части
+    в ней обязаны быть вынесены в ``{% fragment %}``, они подставляются
+    уже после кэша. С ``versioned``
+    в ключ входит ``page_generation()``, и любое изменение контента
+    сразу сбрасывает такие страницы. Условные GET-запросы сверяются с
+    ETag и Last-Modified из кэша, не рендеря страницу.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not (
+                    shared or _is_anonymous(request)):
+                return view(request, *args, **kwargs)
+            key = hashlib.md5(
+                request.build_absolute_uri().encode()).hexdigest()
+            if versioned:
+                key = f'{page_generation()}:{key}'
+            response = single_flight(
+                f'{key_prefix}:{key}',
+                lambda: _with_validators(view(request, *args, **kwargs)),
+                timeout,
+                cacheable=_is_cacheable,
+            )
+            response = _conditional(request, response, vary_on)
+            patch_response_headers(response, timeout)
+            return response
+        return wrapper
+    return decorator
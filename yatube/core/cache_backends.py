@@ -0,0 +1,542 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends import db, filebased, locmem
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+from core.metrics import escape_label, registry
+from core.tracing import span
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+TRACED_METHODS = (
+    'add', 'get', 'set', 'touch', 'delete', 'get_many', 'has_key', 'incr',
+    'decr', 'set_many', 'delete_many', 'clear',
+)
+
+_MISSING = object()
+
+COMPRESSORS = {'zlib': (zlib.compress, zlib.decompress)}
+if lz4 is not None:
+    COMPRESSORS['lz4'] = (lz4.frame.compress, lz4.frame.decompress)
+
+
+def _traced(name):
+    def method(self, *args, **kwargs):
+        with span('cache', name):
+            return getattr(super(TracingMixin, self), name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+class TracingMixin:
+    """Оборачивает обращения к кэшу в span-ы трассировки."""
+
+
+for _name in TRACED_METHODS:
+    setattr(TracingMixin, _name, _traced(_name))
+
+
+class LocMemCache(TracingMixin, locmem.LocMemCache):
+    pass
+
+
+class DatabaseCache(TracingMixin, db.DatabaseCache):
+    pass
+
+
+class FileBasedCache(TracingMixin, filebased.FileBasedCache):
+    """Файловый кэш с атомарным ``add``: на нем держатся блокировки."""
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.has_key(key, version):
+            return False
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            os.link(tmp_path, fname)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+
+
+class MemoryStore:
+    """Хранилище процесса с LRU-вытеснением по суммарному размеру в байтах.
+
+    Значения хранятся сериализованными; начиная с ``compress_min_size``
+    байт они сжимаются, если сжатие действительно уменьшает размер.
+    """
+
+    def __init__(self, max_bytes, compress_min_size=16 * 1024,
+                 compressor='zlib'):
+        if compressor not in COMPRESSORS:
+            raise ImproperlyConfigured(
+                f'Компрессор {compressor!r} недоступен: '
+                f'{", ".join(sorted(COMPRESSORS))}.')
+        self.max_bytes = max_bytes
+        self.compress_min_size = compress_min_size
+        self.compressor = compressor
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.raw_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _dump(self, value):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        raw_size = len(payload)
+        if raw_size >= self.compress_min_size:
+            compress, _ = COMPRESSORS[self.compressor]
+            compressed = compress(payload)
+            if len(compressed) < raw_size:
+                return self.compressor, compressed, raw_size
+        return None, payload, raw_size
+
+    @staticmethod
+    def _load(compressor, payload):
+        if compressor is not None:
+            _, decompress = COMPRESSORS[compressor]
+            payload = decompress(payload)
+        return pickle.loads(payload)
+
+    def _remove(self, key):
+        _, _, payload, raw_size = self._data.pop(key)
+        self.bytes -= len(key) + len(payload)
+        self.raw_bytes -= raw_size
+
+    def _alive(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] is not None and item[0] <= time.time():
+            self._remove(key)
+            return None
+        return item
+
+    def _store(self, key, expires, dumped):
+        compressor, payload, raw_size = dumped
+        size = len(key) + len(payload)
+        if key in self._data:
+            self._remove(key)
+        if size > self.max_bytes:
+            self.evictions += 1
+            return False
+        while self.bytes + size > self.max_bytes:
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+        self._data[key] = (expires, compressor, payload, raw_size)
+        self.bytes += size
+        self.raw_bytes += raw_size
+        return True
+
+    def get(self, key):
+        with self._lock:
+            item = self._alive(key)
+            if item is None:
+                self.misses += 1
+                return _MISSING
+            self.hits += 1
+            self._data.move_to_end(key)
+        return self._load(item[1], item[2])
+
+    def set(self, key, value, expires):
+        dumped = self._dump(value)
+        with self._lock:
+            return self._store(key, expires, dumped)
+
+    def add(self, key, value, expires):
+        dumped = self._dump(value)
+        with self._lock:
+            if self._alive(key) is not None:
+                return False
+            return self._store(key, expires, dumped)
+
+    def incr(self, key, delta):
+        with self._lock:
+            item = self._alive(key)
+            if item is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = self._load(item[1], item[2]) + delta
+            self._store(key, item[0], self._dump(value))
+        return value
+
+    def touch(self, key, expires):
+        with self._lock:
+            item = self._alive(key)
+            if item is None:
+                return False
+            self._data[key] = (expires,) + item[1:]
+            return True
+
+    def contains(self, key):
+        with self._lock:
+            return self._alive(key) is not None
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self.raw_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._data),
+                'bytes': self.bytes,
+                'raw_bytes': self.raw_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(name, factory):
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            store = _stores[name] = factory()
+        return store
+
+
+class StoreStatsCollector:
+    """Статистика хранилищ процесса в формате Prometheus."""
+
+    metrics = (
+        ('hits', 'counter', 'Попадания в локальный кэш.'),
+        ('misses', 'counter', 'Промахи локального кэша.'),
+        ('evictions', 'counter', 'Вытеснения из локального кэша.'),
+        ('entries', 'gauge', 'Число записей в локальном кэше.'),
+        ('bytes', 'gauge', 'Занятый объем локального кэша.'),
+        ('raw_bytes', 'gauge', 'Объем локального кэша без сжатия.'),
+        ('max_bytes', 'gauge', 'Предельный объем локального кэша.'),
+    )
+
+    def clear(self):
+        pass
+
+    def expose(self):
+        with _stores_lock:
+            stats = {name: store.stats() for name, store in _stores.items()}
+        for field, kind, documentation in self.metrics:
+            name = f'yatube_local_cache_{field}'
+            if kind == 'counter':
+                name += '_total'
+            yield f'# HELP {name} {documentation}'
+            yield f'# TYPE {name} {kind}'
+            for store, values in sorted(stats.items()):
+                yield (
+                    f'{name}{{cache="{escape_label(store)}"}} '
+                    f'{values[field]}'
+                )
+
+
+registry.register(StoreStatsCollector())
+
+
+class BoundedMemoryCache(TracingMixin, BaseCache):
+    """Кэш процесса, ограниченный объемом в байтах, а не числом записей.
+
+    OPTIONS:
+        MAX_BYTES — предельный объем сериализованных значений;
+        COMPRESS_MIN_SIZE — с какого размера значения сжимаются;
+        COMPRESSOR — ``zlib`` или ``lz4`` (нужен пакет lz4).
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.store = get_store(name, lambda: MemoryStore(
+            options.get('MAX_BYTES', 64 * 1024 * 1024),
+            options.get('COMPRESS_MIN_SIZE', 16 * 1024),
+            options.get('COMPRESSOR', 'zlib'),
+        ))
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.store.add(
+            self._key(key, version), value, self.get_backend_timeout(timeout))
+
+    def get(self, key, default=None, version=None):
+        value = self.store.get(self._key(key, version))
+        return default if value is _MISSING else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.store.set(
+            self._key(key, version), value, self.get_backend_timeout(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.store.touch(
+            self._key(key, version), self.get_backend_timeout(timeout))
+
+    def incr(self, key, delta=1, version=None):
+        return self.store.incr(self._key(key, version), delta)
+
+    def has_key(self, key, version=None):
+        return self.store.contains(self._key(key, version))
+
+    def delete(self, key, version=None):
+        self.store.delete(self._key(key, version))
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self):
+        return self.store.stats()
+
+
+LOCK_SUFFIX = ':lock'
+
+
+def namespace(key):
+    """Пространство ключа — часть до первого двоеточия."""
+    return key.split(':', 1)[0] if ':' in key else ''
+
+
+class LocalTier(MemoryStore):
+    """Локальный уровень TwoTierCache и версии пространств, которые он видел.
+
+    Записи хранятся парой (версия пространства, значение): смена версии
+    делает недействительными все записи пространства сразу.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.versions = {}
+        self.checked = 0.0
+
+
+class TwoTierCache(TracingMixin, BaseCache):
+    """Локальный LRU процесса перед общим кэшем из CACHES.
+
+    OPTIONS:
+        SHARED — алиас общего кэша (по умолчанию ``shared``);
+        LOCAL_MAX_BYTES — предельный объем локального LRU в байтах;
+        LOCAL_TIMEOUT — сколько секунд значение живет локально;
+        VERSION_CHECK_INTERVAL — как часто сверять версии пространств.
+
+    Сброс (``delete``, ``incr`` или явный ``invalidate``) меняет версию
+    пространства ключа (``follows:``, ``page:`` и т. д.) в общем кэше;
+    увидев новую версию, остальные процессы перестают доверять своим
+    копиям только этого пространства. ``set`` версий не меняет: ключи
+    страниц уже содержат поколение, а объекты и счетчики заполняются
+    чтением после сброса, так что чужих устаревших копий у них нет.
+    Перезапись значения, которое другие процессы могли прочитать, нужно
+    объявить через ``invalidate``. Версия — случайная строка, которая
+    записывается одним ``set``, а не счетчик: параллельные сбросы не
+    могут дать одинаковую версию и потеряться. Ключи блокировок
+    (``...:lock``) живут только в общем кэше и версий не меняют.
+    """
+
+    version_prefix = 'two-tier:version:'
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.check_interval = options.get('VERSION_CHECK_INTERVAL', 1)
+        max_bytes = options.get('LOCAL_MAX_BYTES', 16 * 1024 * 1024)
+        self.local = get_store(
+            f'two-tier:{location or self.shared_alias}',
+            lambda: LocalTier(max_bytes),
+        )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_expires(self, timeout=DEFAULT_TIMEOUT):
+        expires = time.time() + self.local_timeout
+        shared_expires = self.get_backend_timeout(timeout)
+        if shared_expires is None:
+            return expires
+        return min(expires, shared_expires)
+
+    def _version_key(self, space):
+        return f'{self.version_prefix}{space}'
+
+    def _shared_version(self, space):
+        """Версия пространства в общем кэше; после ``clear`` — новая."""
+        version_key = self._version_key(space)
+        version = self.shared.get(version_key)
+        if version is None:
+            self.shared.add(version_key, uuid.uuid4().hex, None)
+            version = self.shared.get(version_key)
+        return version
+
+    def _sync(self):
+        """Раз в интервал сверяет версии пространств одним get_many."""
+        now = time.monotonic()
+        if now - self.local.checked < self.check_interval:
+            return
+        self.local.checked = now
+        known = dict(self.local.versions)
+        if not known:
+            return
+        current = self.shared.get_many(
+            [self._version_key(space) for space in known])
+        for space in known:
+            version = current.get(self._version_key(space))
+            if version is None:
+                version = self._shared_version(space)
+            self.local.versions[space] = version
+
+    def _version(self, key):
+        """Версия пространства ключа; неизвестная читается из общего кэша.
+
+        Версия читается до значения: если значение изменится после, новая
+        версия сбросит сохраненную копию.
+        """
+        space = namespace(key)
+        if space not in self.local.versions:
+            self.local.versions[space] = self._shared_version(space)
+        return self.local.versions[space]
+
+    def _local_get(self, key, version):
+        expected = self.local.versions.get(namespace(key), _MISSING)
+        if expected is _MISSING:
+            return _MISSING
+        entry = self.local.get(self.make_key(key, version))
+        if entry is _MISSING or entry[0] != expected:
+            return _MISSING
+        return entry[1]
+
+    def _local_set(self, key, value, version, expires, space_version):
+        self.local.set(
+            self.make_key(key, version), (space_version, value), expires)
+
+    def _bump(self, keys):
+        """Меняет версии пространств ``keys`` и возвращает новые."""
+        bumped = {}
+        for space in {namespace(key) for key in keys
+                      if not key.endswith(LOCK_SUFFIX)}:
+            version = uuid.uuid4().hex
+            self.shared.set(self._version_key(space), version, None)
+            self.local.versions[space] = bumped[space] = version
+        return bumped
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.add(key, value, timeout, version)
+
+    def get(self, key, default=None, version=None):
+        if key.endswith(LOCK_SUFFIX):
+            return self.shared.get(key, default, version)
+        self._sync()
+        value = self._local_get(key, version)
+        if value is not _MISSING:
+            return value
+        space_version = self._version(key)
+        value = self.shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+        self._local_set(
+            key, value, version, self._local_expires(), space_version)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        found, missing = {}, []
+        for key in keys:
+            value = self._local_get(key, version)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            versions = {key: self._version(key) for key in missing}
+            fetched = self.shared.get_many(missing, version)
+            expires = self._local_expires()
+            for key, value in fetched.items():
+                if not key.endswith(LOCK_SUFFIX):
+                    self._local_set(
+                        key, value, version, expires, versions[key])
+            found.update(fetched)
+        return found
+
+    def has_key(self, key, version=None):
+        self._sync()
+        if self._local_get(key, version) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if key.endswith(LOCK_SUFFIX):
+            self.shared.set(key, value, timeout, version)
+            return
+        space_version = self._version(key)
+        self.shared.set(key, value, timeout, version)
+        self._local_set(
+            key, value, version, self._local_expires(timeout), space_version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        versions = {
+            key: self._version(key) for key in data
+            if not key.endswith(LOCK_SUFFIX)}
+        failed = self.shared.set_many(data, timeout, version)
+        expires = self._local_expires(timeout)
+        for key, space_version in versions.items():
+            if key not in failed:
+                self._local_set(
+                    key, data[key], version, expires, space_version)
+        return failed
+
+    def invalidate(self, keys):
+        """Сбрасывает копии ``keys`` в локальных уровнях всех процессов."""
+        self._bump(keys)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self.shared.delete(key, version)
+        self.local.delete(self.make_key(key, version))
+        self._bump([key])
+
+    def delete_many(self, keys, version=None):
+        self.shared.delete_many(keys, version)
+        for key in keys:
+            self.local.delete(self.make_key(key, version))
+        self._bump(keys)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version)
+        self.local.delete(self.make_key(key, version))
+        self._bump([key])
+        return value
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+        self.local.versions.clear()
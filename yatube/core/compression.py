@@ -0,0 +1,69 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Кодировки в порядке предпочтения сервера.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml)|image/svg\+xml)')
+
+ACCEPT_ENCODING = re.compile(r'([\w*-]+)\s*(?:;\s*q=([\d.]+))?')
+
+
+def choose_encoding(accept_encoding):
+    """Лучшая поддерживаемая кодировка из Accept-Encoding или None."""
+    accepted = {}
+    for name, quality in ACCEPT_ENCODING.findall(accept_encoding.lower()):
+        try:
+            accepted[name] = float(quality) if quality else 1.0
+        except ValueError:
+            continue
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type):
+    return bool(COMPRESSIBLE_TYPES.match(content_type or ''))
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(
+            data, quality=level or settings.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(
+        data, compresslevel=level or settings.COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает поток по частям, сбрасывая буфер после каждой.
+
+    Так события Server-Sent Events доходят до клиента сразу, а не
+    копятся в буфере компрессора.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESS_BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(
+        settings.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(
+            zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,149 @@
+import json
+import logging
+import re
+import sys
+import threading
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger('yatube.slow_queries')
+
+PROJECT_APPS = ('posts', 'users', 'about')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:(?:%s|\?)\s*,\s*)+(?:%s|\?)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """``connection.execute_wrapper`` сразу для всех подключений к БД."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def fingerprint(sql):
+    """Нормализует SQL так, чтобы одинаковые запросы совпадали."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class FingerprintStats:
+    """Счетчики повторов по отпечатку запроса, общие для процесса."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, duration):
+        with self._lock:
+            stats = self._stats.setdefault(
+                key, {'count': 0, 'total': 0.0, 'plan': None})
+            stats['count'] += 1
+            stats['total'] += duration
+            return dict(stats)
+
+    def set_plan(self, key, plan):
+        with self._lock:
+            self._stats[key]['plan'] = plan
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+fingerprints = FingerprintStats()
+
+
+def _is_power_of_two(number):
+    return number & (number - 1) == 0
+
+
+def _origin():
+    """Ближайшая строка шаблона и кадр стека из кода проекта."""
+    origin = {}
+    frame = sys._getframe(2)
+    while frame is not None and len(origin) < 2:
+        module = frame.f_globals.get('__name__', '')
+        if (
+            'template' not in origin
+            and frame.f_code.co_name == 'render_annotated'
+            and module == 'django.template.base'
+        ):
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin['template'] = {
+                'name': getattr(node.origin, 'template_name', None),
+                'line': token.lineno if token else None,
+            }
+        elif 'frame' not in origin and module.startswith(PROJECT_APPS):
+            origin['frame'] = {
+                'module': module,
+                'function': frame.f_code.co_name,
+                'line': frame.f_lineno,
+            }
+        frame = frame.f_back
+    return origin
+
+
+class SlowQueryLog:
+    """execute_wrapper, записывающий запросы дольше порога в журнал."""
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            if duration >= self.threshold:
+                self.log(sql, params, many, context, duration)
+
+    def log(self, sql, params, many, context, duration):
+        key = fingerprint(sql)
+        stats = fingerprints.add(key, duration)
+        if not _is_power_of_two(stats['count']):
+            return
+        if stats['plan'] is None and not many:
+            stats['plan'] = self.explain(context['connection'], sql, params)
+            fingerprints.set_plan(key, stats['plan'])
+        resolver_match = getattr(self.request, 'resolver_match', None)
+        entry = {
+            'fingerprint': key,
+            'sql': sql,
+            'params': params,
+            'duration_ms': round(duration * 1000, 3),
+            'count': stats['count'],
+            'total_ms': round(stats['total'] * 1000, 3),
+            'view': resolver_match.view_name if resolver_match else None,
+            'view_kwargs': resolver_match.kwargs if resolver_match else None,
+            'path': self.request.get_full_path(),
+            'plan': stats['plan'],
+        }
+        entry.update(_origin())
+        logger.warning(json.dumps(entry, ensure_ascii=False, default=str))
+
+    @staticmethod
+    def explain(connection, sql, params):
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        if not connection.features.supports_explaining_query_execution:
+            return None
+        prefix = connection.ops.explain_query_prefix()
+        try:
+            with connection.cursor() as cursor:
+                cursor.cursor.execute(f'{prefix} {sql}', params)
+                return [list(row) for row in cursor.cursor.fetchall()]
+        except DatabaseError:
+            return None
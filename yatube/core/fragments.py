@@ -0,0 +1,61 @@
+import inspect
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from django.http import Http404
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+# Та же разметка, что у SSI в nginx: с EDGE_SIDE_INCLUDES вставки
+# выполняет прокси, запрашивая /fragments/<name>/.
+PLACEHOLDER = re.compile(
+    r'<!--# include virtual="[^"]*?/fragments/(?P<name>[\w-]+)/'
+    r'(?:\?(?P<query>[^"]*))?" -->'
+)
+
+registry = {}
+
+
+def fragment(name):
+    """Регистрирует функцию ``(request, **params) -> str`` под именем."""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def placeholder(name, **params):
+    url = reverse('core:fragment', kwargs={'name': name})
+    if params:
+        url = f'{url}?{urlencode(params)}'
+    return f'<!--# include virtual="{url}" -->'
+
+
+def render_fragment(request, name, params):
+    func = registry.get(name)
+    if func is None:
+        raise Http404(f'Фрагмент {name} не найден.')
+    try:
+        inspect.signature(func).bind(request, **params)
+    except TypeError:
+        raise Http404(f'Неверные параметры фрагмента {name}.')
+    return func(request, **params)
+
+
+def expand(request, content):
+    """Подставляет в страницу фрагменты для текущего пользователя."""
+    def replace(match):
+        params = dict(parse_qsl(match.group('query') or ''))
+        return render_fragment(request, match.group('name'), params)
+    return PLACEHOLDER.sub(replace, content)
+
+
+@fragment('header')
+def header(request, view_name=''):
+    return render_to_string(
+        'includes/header.html', {'view_name': view_name}, request)
+
+
+@fragment('switcher')
+def switcher(request):
+    return render_to_string('includes/switcher.html', request=request)
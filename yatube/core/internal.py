@@ -0,0 +1,57 @@
+import sys
+import threading
+from io import BytesIO
+from urllib.parse import unquote_to_bytes, urlsplit
+
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+
+_handler = None
+_handler_lock = threading.Lock()
+
+
+def internal_request(url, host, secure=False):
+    """WSGIRequest на GET ``url`` — как от сервера, без тестового клиента.
+
+    ``url`` — путь с необязательной строкой запроса, как из reverse().
+    """
+    parts = urlsplit(url)
+    return WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': unquote_to_bytes(parts.path).decode('iso-8859-1'),
+        'QUERY_STRING': parts.query,
+        'SERVER_NAME': host,
+        'SERVER_PORT': '443' if secure else '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'https' if secure else 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    })
+
+
+def _get_handler():
+    global _handler
+    with _handler_lock:
+        if _handler is None:
+            handler = BaseHandler()
+            handler.load_middleware()
+            _handler = handler
+        return _handler
+
+
+def get(url, host, secure=False):
+    """Ответ на внутренний GET через весь стек middleware.
+
+    В отличие от ``django.test.Client`` обработчик не отключает и не
+    отправляет сигналы ``request_started``/``request_finished``, поэтому
+    его можно вызывать из фонового потока рядом с живыми запросами;
+    соединение с БД закрывает вызывающий.
+    """
+    return _get_handler().get_response(internal_request(url, host, secure))
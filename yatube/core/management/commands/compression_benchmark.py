@@ -0,0 +1,45 @@
+from time import process_time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.compression import ENCODINGS, compress
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 5, 11)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет размер ответа и процессорное время сжатия gzip и brotli '
+        'на разных уровнях для страниц сайта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/', '/about/author/'],
+            help='Адреса страниц для замера.')
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз сжимать каждую страницу.')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        for path in options['paths']:
+            response = client.get(path)
+            if response.status_code != 200 or response.streaming:
+                raise CommandError(
+                    f'{path}: ответ {response.status_code}, нужен 200.')
+            content = response.content
+            self.stdout.write(f'{path}: {len(content)} байт без сжатия')
+            for encoding in ENCODINGS:
+                for level in LEVELS[encoding]:
+                    start = process_time()
+                    for _ in range(options['repeat']):
+                        compressed = compress(content, encoding, level)
+                    cpu = (process_time() - start) / options['repeat']
+                    self.stdout.write(
+                        f'  {encoding:<4} {level:>2}: '
+                        f'{len(compressed):>8} байт '
+                        f'({len(compressed) / len(content):6.1%}), '
+                        f'{cpu * 1000:7.3f} мс CPU')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from core.prerender import prerender
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет страницы about и первые страницы групп в PRERENDER_ROOT '
+        'для раздачи веб-сервером; персональные вставки выполняет SSI.'
+    )
+
+    def handle(self, *args, **options):
+        urls = [reverse('about:author'), reverse('about:tech')]
+        urls.extend(
+            reverse('posts:group_posts', kwargs={'slug': slug})
+            for slug in Group.objects.values_list('slug', flat=True)
+        )
+        for url in urls:
+            path = prerender(url)
+            self.stdout.write(f'{url} -> {path}')
+        self.stdout.write(f'Сохранено страниц: {len(urls)}')
@@ -0,0 +1,78 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Выполняется в отдельном процессе, чтобы замерить холодный старт.
+PROBE = '''
+import json, sys
+from time import perf_counter
+from wsgiref.util import setup_testing_defaults
+
+start = perf_counter()
+application = __import__(sys.argv[1], fromlist=['application']).application
+ready = perf_counter() - start
+
+
+def request(path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': sys.argv[2]}
+    setup_testing_defaults(environ)
+    start = perf_counter()
+    body = application(environ, lambda status, headers: None)
+    b''.join(body)
+    body.close()
+    return perf_counter() - start
+
+
+from core.profiling import memory_usage
+
+first = request(sys.argv[3])
+second = request(sys.argv[3])
+print(json.dumps({
+    'ready': ready, 'first': first, 'second': second,
+    'memory': memory_usage(),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает холодный старт yatube.wsgi и yatube.bootstrap: время '
+        'подготовки, первого и второго запроса и память процесса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/about/author/',
+            help='Страница, на которой замерять первые запросы.')
+        parser.add_argument(
+            '--modules', nargs='+',
+            default=['yatube.wsgi', 'yatube.bootstrap'],
+            help='Модули с WSGI-приложением для сравнения.')
+
+    def probe(self, module, path):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, module,
+             settings.ALLOWED_HOSTS[0], path],
+            cwd=settings.BASE_DIR, check=True, stdout=subprocess.PIPE,
+        ).stdout
+        return json.loads(output.decode().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"module":<20} {"ready, ms":>10} {"first, ms":>10} '
+            f'{"second, ms":>11} {"rss, kB":>9} {"private, kB":>12}')
+        for module in options['modules']:
+            result = self.probe(module, options['path'])
+            memory = result['memory']
+            private = (
+                memory.get('Private_Clean', 0)
+                + memory.get('Private_Dirty', 0))
+            self.stdout.write(
+                f'{module:<20} {result["ready"] * 1000:10.1f} '
+                f'{result["first"] * 1000:10.1f} '
+                f'{result["second"] * 1000:11.1f} '
+                f'{memory.get("Rss", memory.get("VmRSS", 0)):9d} '
+                f'{private:12d}')
@@ -0,0 +1,59 @@
+import glob
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SEPARATOR = ' > '
+
+
+def walk(span, path, totals):
+    path = f'{path}{SEPARATOR}{span["name"]}' if path else span['name']
+    children = span.get('children', ())
+    self_ms = span['ms'] - sum(child['ms'] for child in children)
+    stats = totals[path]
+    stats['count'] += 1
+    stats['total'] += span['ms']
+    stats['self'] += max(self_ms, 0.0)
+    for child in children:
+        walk(child, path, totals)
+
+
+class Command(BaseCommand):
+    help = 'Сводка самых затратных путей span-ов из журнала трасс.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=settings.TRACE_LOG,
+            help='Журнал трасс; ротированные части читаются тоже.')
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Сколько путей показать.')
+        parser.add_argument(
+            '--sort', choices=('self', 'total', 'count'), default='self',
+            help='Поле сортировки.')
+
+    def handle(self, *args, **options):
+        totals = defaultdict(lambda: {'count': 0, 'total': 0.0, 'self': 0.0})
+        traces = 0
+        for path in sorted(glob.glob(glob.escape(options['file']) + '*')):
+            with open(path, encoding='utf-8') as log:
+                for line in log:
+                    walk(json.loads(line)['root'], '', totals)
+                    traces += 1
+        if not traces:
+            self.stdout.write('Трассы не найдены.')
+            return
+        rows = sorted(
+            totals.items(), key=lambda item: item[1][options['sort']],
+            reverse=True,
+        )[:options['limit']]
+        self.stdout.write(f'Трасс: {traces}')
+        self.stdout.write(
+            f'{"self, ms":>12} {"total, ms":>12} {"count":>7}  path')
+        for path, stats in rows:
+            self.stdout.write(
+                f'{stats["self"]:12.1f} {stats["total"]:12.1f} '
+                f'{stats["count"]:7d}  {path}'
+            )
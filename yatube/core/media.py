@@ -0,0 +1,91 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.utils._os import safe_join
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Открытый файл, из которого читается только ``length`` байт.
+
+    ``fileno`` остается доступен, так что gunicorn отдает и диапазон
+    через ``os.sendfile``, ограничивая его по Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def media_file(path):
+    """(полный путь, os.stat) файла из MEDIA_ROOT или Http404."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        status = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404('Файл не найден.')
+    if not stat.S_ISREG(status.st_mode):
+        raise Http404('Файл не найден.')
+    return full_path, status
+
+
+def file_etag(status):
+    """Сильный ETag из времени изменения и размера файла."""
+    return f'"{status.st_mtime_ns:x}-{status.st_size:x}"'
+
+
+def content_type(path):
+    content_type, encoding = mimetypes.guess_type(path)
+    if encoding:
+        return 'application/octet-stream'
+    return content_type or 'application/octet-stream'
+
+
+def byte_range(header, size):
+    """Диапазон (start, end) включительно из заголовка Range.
+
+    None — заголовок надо проигнорировать и отдать файл целиком
+    (несколько диапазонов, неверный синтаксис). ValueError — диапазон
+    неудовлетворим, ответ 416.
+    """
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if not suffix or not size:
+            raise ValueError(header)
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
@@ -0,0 +1,147 @@
+import bisect
+import threading
+from time import perf_counter
+
+INF = float('inf')
+
+TIME_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, INF,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, INF)
+SIZE_BUCKETS = (
+    1024, 4096, 16384, 65536, 262144, 1048576, 4194304, INF,
+)
+
+
+def _format_value(value):
+    if value == INF:
+        return '+Inf'
+    return repr(float(value))
+
+
+def escape_label(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus с одной меткой ``view``."""
+
+    def __init__(self, name, documentation, buckets=TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [[0] * len(self.buckets), 0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        with self._lock:
+            snapshot = sorted(
+                (view, list(counts), total, count)
+                for view, (counts, total, count) in self._series.items()
+            )
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for view, counts, total, count in snapshot:
+            label = f'view="{escape_label(view)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (
+                    f'{self.name}_bucket{{{label},'
+                    f'le="{_format_value(bound)}"}} {cumulative}'
+                )
+            yield f'{self.name}_sum{{{label}}} {_format_value(total)}'
+            yield f'{self.name}_count{{{label}}} {count}'
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, name, documentation, buckets=TIME_BUCKETS):
+        metric = Histogram(name, documentation, buckets)
+        return self.register(metric)
+
+    def register(self, collector):
+        self._metrics.append(collector)
+        return collector
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def expose(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    'yatube_request_duration_seconds',
+    'Полное время обработки запроса.',
+)
+DB_QUERIES = registry.histogram(
+    'yatube_db_queries',
+    'Число SQL-запросов за запрос.',
+    COUNT_BUCKETS,
+)
+DB_SECONDS = registry.histogram(
+    'yatube_db_duration_seconds',
+    'Суммарное время SQL-запросов за запрос.',
+)
+TEMPLATE_SECONDS = registry.histogram(
+    'yatube_template_render_seconds',
+    'Время рендеринга шаблонов, включая ленивые запросы из шаблона.',
+)
+RESPONSE_BYTES = registry.histogram(
+    'yatube_response_size_bytes',
+    'Размер тела ответа.',
+    SIZE_BUCKETS,
+)
+
+
+class RequestStats:
+    """Счетчики одного запроса; экземпляр служит и execute_wrapper-ом."""
+
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+
+    def observe(self, view, duration, response):
+        REQUEST_SECONDS.observe(view, duration)
+        DB_QUERIES.observe(view, self.queries)
+        DB_SECONDS.observe(view, self.db_time)
+        TEMPLATE_SECONDS.observe(view, self.template_time)
+        if not response.streaming:
+            RESPONSE_BYTES.observe(view, len(response.content))
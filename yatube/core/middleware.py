@@ -0,0 +1,224 @@
+import random
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core.compression import (
+    choose_encoding, compress, compress_stream, is_compressible,
+)
+from core.db import SlowQueryLog, execute_wrapper
+from core.fragments import expand
+from core.metrics import RequestStats
+from core.profiling import collapsed_stacks, cpu_profile, memory_profile
+from core.tracing import TracingDatabaseWrapper, span, trace
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+def view_name(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match else UNRESOLVED_VIEW
+
+
+def server_timing(template_profile, limit=10):
+    rows = sorted(
+        template_profile.items(), key=lambda item: item[1][1], reverse=True)
+    return ', '.join(
+        'tpl{};desc="{} {}";dur={:.2f}'.format(
+            index, template, node.replace('"', "'"), seconds * 1000)
+        for index, ((template, node), (_, seconds))
+        in enumerate(rows[:limit])
+    )
+
+
+class MetricsMiddleware:
+    """Собирает время, запросы к БД, рендеринг и размер ответа по view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.metrics = RequestStats()
+        start = perf_counter()
+        with execute_wrapper(stats):
+            response = self.get_response(request)
+        stats.observe(view_name(request), perf_counter() - start, response)
+        template_profile = getattr(request, 'template_profile', None)
+        if template_profile:
+            response['Server-Timing'] = server_timing(template_profile)
+        return response
+
+
+def is_html(response):
+    return response.get('Content-Type', '').startswith('text/html')
+
+
+class CompressionMiddleware:
+    """Сжимает ответы в brotli или gzip по Accept-Encoding.
+
+    Обычные ответы короче COMPRESS_MIN_SIZE не сжимаются: заголовки и
+    работа компрессора обойдутся дороже выигрыша. Потоковые ответы
+    сжимаются по частям со сбросом буфера. Brotli доступен, если
+    установлен пакет ``brotli``. Файлы (FileResponse) и частичные ответы
+    не сжимаются: их тело отдается через sendfile как есть. С
+    EDGE_SIDE_INCLUDES не сжимается и HTML: SSI в nginx не разбирает
+    сжатое тело, поэтому страницы и фрагменты сжимает уже сам прокси.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESS_MIN_SIZE
+        self.edge_side_includes = settings.EDGE_SIDE_INCLUDES
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or getattr(response, 'file_to_stream', None) is not None
+            or not is_compressible(response.get('Content-Type'))
+            or self.edge_side_includes and is_html(response)
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < self.min_size:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """Пишет в журнал SQL-запросы дольше SLOW_QUERY_THRESHOLD_MS."""
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def __call__(self, request):
+        with execute_wrapper(SlowQueryLog(request, self.threshold)):
+            return self.get_response(request)
+
+
+class TracingMiddleware:
+    """Трассирует долю запросов TRACE_SAMPLE_RATE в журнал трасс."""
+
+    def __init__(self, get_response):
+        if not settings.TRACE_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.TRACE_SAMPLE_RATE
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        with trace('request', request.method, path=request.path) as root:
+            with execute_wrapper(TracingDatabaseWrapper()):
+                response = self.get_response(request)
+            root.tags['view'] = view_name(request)
+            root.tags['status'] = response.status_code
+        return response
+
+
+class TracingViewMiddleware:
+    """Последний middleware: выделяет в трассе span самой view."""
+
+    def __init__(self, get_response):
+        if not settings.TRACE_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with span('view') as view_span:
+            response = self.get_response(request)
+            if view_span is not None:
+                view_span.label = view_name(request)
+        return response
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос персонала по ?_profile=cpu|mem|collapsed.
+
+    Вместо страницы возвращается отчет профилировщика. Для остальных
+    запросов middleware ограничивается проверкой строки запроса.
+    """
+
+    parameter = '_profile'
+    header = 'HTTP_X_PROFILE'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            self.parameter not in request.META.get('QUERY_STRING', '')
+            and self.header not in request.META
+        ):
+            return self.get_response(request)
+        mode = request.GET.get(self.parameter) or request.META.get(self.header)
+        if not request.user.is_staff:
+            return self.get_response(request)
+        if mode == 'cpu':
+            _, report = cpu_profile(
+                self.get_response, request,
+                sort=request.GET.get('_sort', 'cumulative'))
+        elif mode == 'mem':
+            _, report = memory_profile(self.get_response, request)
+        elif mode == 'collapsed':
+            _, report = collapsed_stacks(self.get_response, request)
+        else:
+            return self.get_response(request)
+        response = HttpResponse(
+            report, content_type='text/plain; charset=utf-8')
+        response['X-Profile'] = mode
+        return response
+
+
+class FragmentMiddleware:
+    """Подставляет персональные фрагменты в HTML-страницы.
+
+    При EDGE_SIDE_INCLUDES вставки остаются в ответе и их выполняет
+    прокси, запрашивая фрагменты по ``/fragments/<name>/``.
+    """
+
+    marker = b'<!--# include virtual='
+
+    def __init__(self, get_response):
+        if settings.EDGE_SIDE_INCLUDES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or not response.get('Content-Type', '').startswith('text/html')
+            or self.marker not in response.content
+        ):
+            return response
+        response.content = expand(
+            request, response.content.decode(response.charset))
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        return response
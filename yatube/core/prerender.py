@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.urls import resolve
+
+from core.internal import internal_request
+
+
+def prerendered_path(url):
+    """Файл в PRERENDER_ROOT, который веб-сервер отдаст по ``url``."""
+    return os.path.join(
+        settings.PRERENDER_ROOT, url.strip('/'), 'index.html')
+
+
+def is_prerendered(url):
+    return os.path.exists(prerendered_path(url))
+
+
+def render_page(url):
+    """HTML страницы для анонимного пользователя.
+
+    View вызывается напрямую, без middleware: вставки ``{% fragment %}``
+    остаются в странице, и их выполняет веб-сервер через SSI.
+    """
+    request = internal_request(url, settings.ALLOWED_HOSTS[0])
+    request.user = AnonymousUser()
+    request.resolver_match = match = resolve(request.path_info)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def prerender(url):
+    """Записывает страницу в файл; возвращает путь или None."""
+    content = render_page(url)
+    if content is None:
+        remove(url)
+        return None
+    path = prerendered_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(descriptor, 'wb') as temp_file:
+        temp_file.write(content)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, path)
+    return path
+
+
+def remove(url):
+    try:
+        os.remove(prerendered_path(url))
+    except FileNotFoundError:
+        pass
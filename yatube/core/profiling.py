@@ -0,0 +1,118 @@
+import cProfile
+import io
+import pstats
+import resource
+import sys
+import tracemalloc
+from collections import Counter
+from time import perf_counter
+
+PSTATS_SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls')
+
+
+def cpu_profile(func, *args, sort='cumulative', limit=60):
+    """Выполняет вызов под cProfile и возвращает (результат, отчет)."""
+    if sort not in PSTATS_SORT_KEYS:
+        sort = 'cumulative'
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, stream.getvalue()
+
+
+def memory_profile(func, *args, limit=60):
+    """Выполняет вызов под tracemalloc и возвращает (результат, отчет)."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(25)
+    elif hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    try:
+        result = func(*args)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    filters = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    )
+    diff = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), 'lineno')
+    lines = [
+        f'Текущий объем: {current / 1024:.1f} KiB, '
+        f'пик: {peak / 1024:.1f} KiB',
+        '',
+    ]
+    lines.extend(str(stat) for stat in diff[:limit])
+    return result, '\n'.join(lines) + '\n'
+
+
+class _StackCollector:
+    """Точный профилировщик на sys.setprofile со свернутыми стеками."""
+
+    def __init__(self):
+        self.stack = []
+        self.samples = Counter()
+        self.last = None
+
+    def __call__(self, frame, event, arg):
+        now = perf_counter()
+        if self.stack:
+            self.samples[';'.join(self.stack)] += now - self.last
+        if event == 'call':
+            code = frame.f_code
+            module = frame.f_globals.get('__name__', '?')
+            self.stack.append(f'{module}:{code.co_name}')
+        elif event == 'c_call':
+            module = getattr(arg, '__module__', None) or 'builtins'
+            self.stack.append(f'{module}:{arg.__qualname__}')
+        elif event in ('return', 'c_return', 'c_exception') and self.stack:
+            self.stack.pop()
+        self.last = perf_counter()
+
+
+def collapsed_stacks(func, *args):
+    """Свернутые стеки в формате flamegraph.pl, веса в микросекундах."""
+    collector = _StackCollector()
+    collector.last = perf_counter()
+    sys.setprofile(collector)
+    try:
+        result = func(*args)
+    finally:
+        sys.setprofile(None)
+    lines = sorted(
+        f'{stack} {round(seconds * 1_000_000)}'
+        for stack, seconds in collector.samples.items()
+        if seconds >= 0.000001
+    )
+    return result, '\n'.join(lines) + '\n'
+
+
+def memory_usage():
+    """RSS процесса и его разделяемая и частная части в килобайтах.
+
+    Для воркеров после fork важна частная часть: это страницы, которые
+    уже скопированы из мастера или выделены заново.
+    """
+    usage = {}
+    for path in ('/proc/self/smaps_rollup', '/proc/self/status'):
+        try:
+            with open(path) as status:
+                for line in status:
+                    key, _, value = line.partition(':')
+                    if key in ('Rss', 'VmRSS', 'Pss', 'Shared_Clean',
+                               'Shared_Dirty', 'Private_Clean',
+                               'Private_Dirty'):
+                        usage.setdefault(key, int(value.split()[0]))
+        except OSError:
+            continue
+    if not usage:
+        usage['MaxRSS'] = resource.getrusage(
+            resource.RUSAGE_SELF).ru_maxrss
+    return usage
@@ -0,0 +1,47 @@
+import mimetypes
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from core.compression import ENCODINGS, compress, is_compressible
+
+EXTENSIONS = {'gzip': '.gz', 'br': '.br'}
+MAX_LEVELS = {'gzip': 9, 'br': 11}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и сжатыми копиями рядом.
+
+    После ``collectstatic`` для каждого текстового файла появляются
+    ``.gz`` и, если установлен brotli, ``.br`` с максимальным сжатием.
+    Веб-сервер отдает их как есть (gzip_static, brotli_static), а
+    хэшированные имена можно кэшировать навсегда.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = {}
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed[name] = hashed_name
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name, hashed_name in hashed.items():
+            for target in (name, hashed_name):
+                self.compress_file(target)
+
+    def compress_file(self, name):
+        content_type, _ = mimetypes.guess_type(name)
+        if not is_compressible(content_type):
+            return
+        with self.open(name) as source:
+            data = source.read()
+        if len(data) < settings.COMPRESS_MIN_SIZE:
+            return
+        path = self.path(name)
+        for encoding in ENCODINGS:
+            compressed = compress(data, encoding, MAX_LEVELS[encoding])
+            if len(compressed) < len(data):
+                with open(path + EXTENSIONS[encoding], 'wb') as file:
+                    file.write(compressed)
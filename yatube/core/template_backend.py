@@ -0,0 +1,54 @@
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+from core.template_profiler import ProfilingEngine, record
+from core.tracing import span
+
+
+class Template(django_backend.Template):
+    """Шаблон, который учитывает рендеринг в метриках и трассах."""
+
+    def render(self, context=None, request=None):
+        with span('template', self.origin.template_name):
+            stats = getattr(request, 'metrics', None)
+            if stats is None and not self.backend.profiling:
+                return super().render(context, request)
+            start = perf_counter()
+            try:
+                return super().render(context, request)
+            finally:
+                elapsed = perf_counter() - start
+                if stats is not None:
+                    stats.template_time += elapsed
+                if self.backend.profiling:
+                    record(
+                        request, (self.origin.template_name, 'template'),
+                        elapsed)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Бэкенд Django-шаблонов с метриками, трассами и профилированием.
+
+    Опция ``profiling`` в OPTIONS включает таймеры на include-ах, своих
+    тегах и фильтрах всех загружаемых шаблонов.
+    """
+
+    def __init__(self, params):
+        params = params.copy()
+        options = params['OPTIONS'] = params.get('OPTIONS', {}).copy()
+        profiling = options.pop('profiling', False)
+        super().__init__(params)
+        self.profiling = profiling
+        if profiling:
+            self.engine = ProfilingEngine.wrap(self.engine)
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
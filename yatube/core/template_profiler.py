@@ -0,0 +1,136 @@
+import threading
+from time import perf_counter
+
+from django.template.base import Node, VariableNode
+from django.template.engine import Engine
+from django.template.loader_tags import IncludeNode
+
+from core.metrics import escape_label, registry
+
+
+class TemplateProfile:
+    """Суммарное время рендеринга шаблонов, include-ов и своих тегов."""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, seconds):
+        with self._lock:
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+
+    def slowest(self, limit=None):
+        with self._lock:
+            rows = [
+                (template, node, count, seconds)
+                for (template, node), (count, seconds)
+                in self._totals.items()
+            ]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows[:limit]
+
+    def expose(self):
+        rows = self.slowest()
+        name = 'yatube_template_node_seconds_total'
+        yield f'# HELP {name} Время рендеринга узлов шаблонов.'
+        yield f'# TYPE {name} counter'
+        for template, node, _, seconds in rows:
+            yield (
+                f'{name}{{template="{escape_label(template)}",'
+                f'node="{escape_label(node)}"}} {seconds!r}'
+            )
+        name = 'yatube_template_node_renders_total'
+        yield f'# HELP {name} Число рендерингов узлов шаблонов.'
+        yield f'# TYPE {name} counter'
+        for template, node, count, _ in rows:
+            yield (
+                f'{name}{{template="{escape_label(template)}",'
+                f'node="{escape_label(node)}"}} {count}'
+            )
+
+
+template_profile = TemplateProfile()
+registry.register(template_profile)
+
+
+def record(request, key, seconds):
+    template_profile.add(key, seconds)
+    if request is None:
+        return
+    totals = request.__dict__.setdefault('template_profile', {})
+    count, total = totals.get(key, (0, 0.0))
+    totals[key] = (count + 1, total + seconds)
+
+
+def node_label(node):
+    """Подпись узла или None, если узел профилировать не нужно."""
+    if isinstance(node, IncludeNode):
+        return f'include {node.template.token}'
+    if isinstance(node, VariableNode):
+        filters = [
+            getattr(func, '__name__', repr(func))
+            for func, _ in node.filter_expression.filters
+            if not getattr(func, '__module__', '').startswith('django.')
+        ]
+        return f'filter {"|".join(filters)}' if filters else None
+    func = getattr(node, 'func', None)
+    module = getattr(func or node, '__module__', '') or ''
+    token = getattr(node, 'token', None)
+    if module.startswith('django.') or token is None:
+        return None
+    return f'tag {token.split_contents()[0]}'
+
+
+def _timed(render_annotated, key):
+    def timed_render_annotated(context):
+        start = perf_counter()
+        try:
+            return render_annotated(context)
+        finally:
+            record(
+                getattr(context, 'request', None), key,
+                perf_counter() - start)
+    return timed_render_annotated
+
+
+def instrument(template):
+    if getattr(template, 'profiled', False):
+        return template
+    name = template.origin.template_name or template.origin.name
+    for node in template.nodelist.get_nodes_by_type(Node):
+        label = node_label(node)
+        if label is not None:
+            node.render_annotated = _timed(
+                node.render_annotated, (name, label))
+    template.profiled = True
+    return template
+
+
+class ProfilingEngine(Engine):
+    """Engine, который размечает загружаемые шаблоны таймерами."""
+
+    @classmethod
+    def wrap(cls, engine):
+        """ProfilingEngine с настройками готового ``engine``.
+
+        Состояние копируется целиком, так что обертка не зависит от
+        сигнатуры ``Engine.__init__`` в конкретной версии Django.
+        """
+        profiling = cls.__new__(cls)
+        profiling.__dict__.update(engine.__dict__)
+        return profiling
+
+    def find_template(self, name, dirs=None, skip=None):
+        template, origin = super().find_template(name, dirs, skip)
+        return instrument(template), origin
+
+    def from_string(self, template_code):
+        return instrument(super().from_string(template_code))
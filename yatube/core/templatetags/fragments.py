@@ -0,0 +1,11 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.fragments import placeholder
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment(name, **params):
+    return mark_safe(placeholder(name, **params))
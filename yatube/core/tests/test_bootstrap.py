@@ -0,0 +1,57 @@
+import gc
+import logging
+from logging.handlers import BufferingHandler
+from unittest import mock
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase
+
+from core.profiling import memory_usage
+
+
+class BootstrapTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Django уже настроен тестами: повторный django.setup() заново
+        # применил бы LOGGING и вывел журнал подготовки в консоль.
+        handler = BufferingHandler(capacity=100)
+        with mock.patch.object(
+                logging.getLogger('yatube.bootstrap'), 'handlers', [handler]
+        ), mock.patch('django.core.wsgi.get_wsgi_application', WSGIHandler):
+            from yatube import bootstrap
+        cls.bootstrap = bootstrap
+        cls.messages = [record.getMessage() for record in handler.buffer]
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.unfreeze()
+        super().tearDownClass()
+
+    def test_preload_steps(self):
+        """Подготовка проходит все шаги и замораживает объекты."""
+        steps = {
+            name: result
+            for name, _, result in self.bootstrap.startup_timings
+        }
+
+        self.assertGreater(steps['resolve_urls'], 10)
+        self.assertGreater(steps['compile_templates'], 10)
+        self.assertGreater(steps['gc_freeze'], 0)
+        self.assertIn('get_wsgi_application', steps)
+
+    def test_startup_logged(self):
+        """Шаги подготовки и память мастера попадают в журнал."""
+        self.assertTrue(any(
+            message.startswith('bootstrap resolve_urls')
+            for message in self.messages), self.messages)
+        self.assertTrue(any(
+            message.startswith('master ready')
+            for message in self.messages), self.messages)
+
+    def test_memory_usage(self):
+        """Отчет о памяти содержит RSS процесса."""
+        usage = memory_usage()
+
+        self.assertTrue(
+            {'Rss', 'VmRSS', 'MaxRSS'} & set(usage), usage)
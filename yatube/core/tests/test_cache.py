@@ -0,0 +1,190 @@
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+from django.urls import reverse
+
+from core.cache import cached_page, single_flight
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'LOCATION': 'test-single-flight',
+        'OPTIONS': {'SHARED': 'shared'},
+    },
+    'shared': {
+        'BACKEND': 'core.cache_backends.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    },
+})
+class SingleFlightTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def compute(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return 'value'
+
+    def test_concurrent_callers_compute_once(self):
+        """Из многих одновременных вызовов пересчитывает только один."""
+        threads_count = 10
+        barrier = threading.Barrier(threads_count)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(single_flight('key', self.compute, 60))
+
+        threads = [
+            threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['value'] * threads_count)
+
+    def test_stale_value_served_while_regenerating(self):
+        """Пока идет пересчет, остальные получают устаревшее значение."""
+        cache.set('key', ('stale', 0.1, time.time() - 1), 60)
+        cache.add('key:lock', 1)
+
+        self.assertEqual(single_flight('key', self.compute, 60), 'stale')
+        self.assertEqual(self.calls, 0)
+
+    def test_expired_value_recomputed(self):
+        """Истекшее значение пересчитывается, если блокировка свободна."""
+        cache.set('key', ('stale', 0.1, time.time() - 1), 60)
+
+        self.assertEqual(single_flight('key', self.compute, 60), 'value')
+        self.assertEqual(cache.get('key')[0], 'value')
+
+    def test_recomputed_value_read_from_shared_cache(self):
+        """Истекшая локальная копия не пересчитывается, если другой
+        процесс уже записал свежее значение в общий кэш."""
+        cache.set('key', ('stale', 0.1, time.time() - 1), 60)
+        cache.shared.set('key', ('fresh', 0.1, time.time() + 60), 60)
+
+        self.assertEqual(single_flight('key', self.compute, 60), 'fresh')
+        self.assertEqual(self.calls, 0)
+
+
+class CachedPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get(self, view, user):
+        request = RequestFactory().get('/page/')
+        request.user = user
+        return view(request).content.decode()
+
+    def test_personal_pages_not_shared(self):
+        """Без shared страница вошедшего пользователя не кэшируется."""
+        @cached_page(60, key_prefix='test-page')
+        def view(request):
+            return HttpResponse(f'user={request.user.username}')
+
+        user = User.objects.create_user(username='Leo')
+
+        self.assertEqual(self.get(view, user), 'user=Leo')
+        self.assertEqual(self.get(view, AnonymousUser()), 'user=')
+        self.assertEqual(self.get(view, user), 'user=Leo')
+
+    def test_shared_pages_cached_for_everyone(self):
+        """С shared одна копия страницы отдается всем пользователям."""
+        @cached_page(60, key_prefix='test-shared-page', shared=True)
+        def view(request):
+            return HttpResponse(f'user={request.user.username}')
+
+        self.get(view, AnonymousUser())
+
+        self.assertEqual(
+            self.get(view, User.objects.create_user(username='Leo')),
+            'user=')
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.reader = User.objects.create_user(username='Olga')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        Post.objects.create(
+            text='test-post', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        self.url = reverse('posts:profile', kwargs={'username': 'Leo'})
+
+    def test_not_modified_without_rendering(self):
+        """Совпавший ETag или дата дают 304 без рендеринга страницы."""
+        response = self.guest_client.get(self.url)
+        conditions = {
+            'HTTP_IF_NONE_MATCH': response['ETag'],
+            'HTTP_IF_MODIFIED_SINCE': response['Last-Modified'],
+        }
+        for header, value in conditions.items():
+            with self.subTest(header=header):
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(
+                        self.url, **{header: value})
+
+                self.assertEqual(response.status_code, 304)
+                self.assertTemplateNotUsed(response, 'posts/profile.html')
+
+    def test_content_change_modifies_page(self):
+        """После изменения контента страница отдается заново."""
+        etag = self.guest_client.get(self.url)['ETag']
+        Post.objects.create(text='new-post', author=self.author)
+
+        response = self.guest_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'new-post')
+
+    def test_etag_depends_on_viewer(self):
+        """ETag учитывает пользователя и его подписки."""
+        guest_etag = self.guest_client.get(self.url)['ETag']
+        response = self.authorized_client.get(self.url)
+        etag = response['ETag']
+        Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertNotEqual(etag, guest_etag)
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertEqual(
+            self.authorized_client.get(
+                self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            200)
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.cache_backends import BoundedMemoryCache, TwoTierCache
+
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'LOCATION': 'test-two-tier',
+        'OPTIONS': {'SHARED': 'shared', 'LOCAL_MAX_BYTES': 1024},
+    },
+    'shared': {
+        'BACKEND': 'core.cache_backends.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    },
+})
+class TwoTierCacheTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def other_process(self):
+        """Второй процесс: свой локальный уровень над тем же общим кэшем."""
+        return TwoTierCache('other-process', {
+            'OPTIONS': {'SHARED': 'shared', 'VERSION_CHECK_INTERVAL': 0},
+        })
+
+    def test_reads_served_from_local_tier(self):
+        """Повторное чтение не обращается к общему кэшу."""
+        self.cache.set('key', 'value')
+        self.shared.set('key', 'changed-behind-our-back')
+
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_local_tier_is_bounded(self):
+        """Локальный уровень вытесняет самые старые ключи по объему."""
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, os.urandom(400))
+
+        self.assertLessEqual(self.cache.local.stats()['bytes'], 1024)
+        self.assertFalse(self.cache.local.contains(self.cache.make_key('a')))
+        self.assertTrue(self.cache.local.contains(self.cache.make_key('c')))
+
+    def test_deletes_invalidate_other_processes(self):
+        """Удаление в одном процессе сбрасывает локальные копии в других."""
+        other = self.other_process()
+        self.cache.set('key', 'old')
+        self.assertEqual(other.get('key'), 'old')
+
+        self.cache.delete('key')
+        self.assertIsNone(other.get('key'))
+        self.cache.set('key', 'new')
+
+        self.assertEqual(other.get('key'), 'new')
+
+    def test_writes_do_not_invalidate(self):
+        """set не сбрасывает чужие копии пространства, invalidate — да."""
+        other = self.other_process()
+        self.cache.set('page:1', 'old')
+        other.get('page:1')
+        self.shared.set('page:1', 'changed-behind-our-back')
+
+        self.cache.set('page:2', 'value')
+        self.assertEqual(other.get('page:1'), 'old')
+
+        self.cache.invalidate(['page:2'])
+        self.assertEqual(other.get('page:1'), 'changed-behind-our-back')
+
+    def test_invalidation_limited_to_namespace(self):
+        """Сброс затрагивает в других процессах только свое пространство."""
+        other = self.other_process()
+        self.cache.set('follows:1', 'old')
+        self.cache.set('unread:1', 'old')
+        other.get('follows:1')
+        other.get('unread:1')
+        self.shared.set('unread:1', 'changed-behind-our-back')
+
+        self.cache.delete('follows:1')
+
+        self.assertIsNone(other.get('follows:1'))
+        self.assertEqual(other.get('unread:1'), 'old')
+
+    def test_lock_keys_do_not_change_versions(self):
+        """Блокировки не меняют версий и не кэшируются локально."""
+        other = self.other_process()
+        self.cache.set('page:1', 'value')
+        other.get('page:1')
+        self.shared.set('page:1', 'changed-behind-our-back')
+
+        self.assertTrue(self.cache.add('page:1:lock', 1))
+        self.assertEqual(other.get('page:1:lock'), 1)
+        self.cache.delete('page:1:lock')
+
+        self.assertIsNone(other.get('page:1:lock'))
+        self.assertEqual(other.get('page:1'), 'value')
+
+    def test_add_is_atomic_in_shared_cache(self):
+        """add проходит только для отсутствующего ключа."""
+        self.assertTrue(self.cache.add('lock', 1))
+        self.assertFalse(self.other_process().add('lock', 1))
+
+
+class BoundedMemoryCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = BoundedMemoryCache('test-bounded', {
+            'OPTIONS': {'MAX_BYTES': 64 * 1024, 'COMPRESS_MIN_SIZE': 1024},
+        })
+        self.cache.clear()
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        """Вытесняются давно не читанные записи, объем не превышен."""
+        evictions = self.cache.stats()['evictions']
+        for key in range(5):
+            self.cache.set(key, os.urandom(20 * 1024))
+            self.cache.get(0)
+        stats = self.cache.stats()
+
+        self.assertLessEqual(stats['bytes'], 64 * 1024)
+        self.assertEqual(stats['evictions'], evictions + 2)
+        self.assertIsNotNone(self.cache.get(0))
+        self.assertIsNone(self.cache.get(1))
+
+    def test_large_values_compressed(self):
+        """Крупные значения хранятся сжатыми."""
+        page = 'Последние обновления на сайте' * 1000
+        self.cache.set('page', page)
+        stats = self.cache.stats()
+
+        self.assertEqual(self.cache.get('page'), page)
+        self.assertLess(stats['bytes'] * 10, stats['raw_bytes'])
+
+    def test_hit_and_miss_statistics(self):
+        """Попадания и промахи считаются."""
+        hits, misses = self.cache.stats()['hits'], self.cache.stats()['misses']
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('missing')
+
+        self.assertEqual(self.cache.stats()['hits'], hits + 1)
+        self.assertEqual(self.cache.stats()['misses'], misses + 1)
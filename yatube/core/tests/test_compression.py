@@ -0,0 +1,130 @@
+import gzip
+import os
+import shutil
+import tempfile
+import zlib
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+
+from core import compression
+from core.middleware import CompressionMiddleware
+
+PAGE = '<p>Последние обновления на сайте</p>\n' * 100
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def get(self, response, accept_encoding='gzip, deflate'):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_html_gzipped(self):
+        """HTML сжимается, ETag становится слабым, Vary выставлен."""
+        response = HttpResponse(PAGE)
+        response['ETag'] = '"abc"'
+        response = self.get(response, 'gzip;q=1.0, br;q=0')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), PAGE)
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skipped_responses(self):
+        """Короткие, бинарные ответы и клиенты без gzip не сжимаются."""
+        cases = (
+            (HttpResponse('short'), 'gzip'),
+            (HttpResponse(b'PNG' * 500, content_type='image/png'), 'gzip'),
+            (HttpResponse(PAGE), 'identity'),
+            (HttpResponse(PAGE), 'gzip;q=0'),
+        )
+        for response, accept_encoding in cases:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.get(response, accept_encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(EDGE_SIDE_INCLUDES=True)
+    def test_html_left_for_ssi(self):
+        """С EDGE_SIDE_INCLUDES HTML уходит прокси несжатым для SSI."""
+        html = self.get(HttpResponse(PAGE))
+        text = self.get(HttpResponse(PAGE, content_type='text/plain'))
+
+        self.assertFalse(html.has_header('Content-Encoding'))
+        self.assertEqual(html.content.decode(), PAGE)
+        self.assertEqual(text['Content-Encoding'], 'gzip')
+
+    def test_streaming_flushed_per_chunk(self):
+        """Каждая часть потока сразу распаковывается на клиенте."""
+        chunks = [f'data: {index}\n\n'.encode() for index in range(3)]
+        response = self.get(StreamingHttpResponse(
+            iter(chunks), content_type='text/event-stream'))
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        received = [
+            decompressor.decompress(part)
+            for part in response.streaming_content
+        ]
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(received[:3], chunks)
+
+    def test_choose_encoding(self):
+        """Кодировка выбирается по Accept-Encoding с учетом q."""
+        self.assertEqual(
+            compression.choose_encoding('*'), compression.ENCODINGS[0])
+        self.assertEqual(
+            compression.choose_encoding('br;q=0, *;q=0.5'), 'gzip')
+        self.assertIsNone(compression.choose_encoding('deflate'))
+        self.assertIsNone(compression.choose_encoding('gzip;q=0, br;q=0'))
+
+
+class CompressedStaticTests(TestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        with open(os.path.join(self.source, 'site.css'), 'w') as file:
+            file.write('body { color: black; }\n' * 100)
+        with open(os.path.join(self.source, 'tiny.css'), 'w') as file:
+            file.write('a {}')
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """collectstatic пишет хэшированные имена и .gz рядом с ними."""
+        with override_settings(
+            STATICFILES_DIRS=[self.source], STATIC_ROOT=self.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        files = set(os.listdir(self.root))
+        hashed = [
+            name for name in files
+            if name.startswith('site.') and name.endswith('.css')
+            and name != 'site.css'
+        ]
+
+        self.assertEqual(len(hashed), 1)
+        self.assertIn(f'{hashed[0]}.gz', files)
+        self.assertIn('site.css.gz', files)
+        self.assertNotIn('tiny.css.gz', files)
+        with gzip.open(os.path.join(self.root, 'site.css.gz')) as file:
+            self.assertTrue(file.read().startswith(b'body'))
+
+
+class CompressionBenchmarkTests(TestCase):
+    def test_benchmark_command(self):
+        """compression_benchmark печатает размер и время по уровням."""
+        cache.clear()
+        out = StringIO()
+        call_command(
+            'compression_benchmark', '/about/author/', repeat=1, stdout=out)
+
+        self.assertIn('gzip  6', out.getvalue())
+        self.assertIn('мс CPU', out.getvalue())
@@ -0,0 +1,62 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.db import fingerprint, fingerprints
+
+User = get_user_model()
+
+
+@override_settings(
+    SLOW_QUERY_THRESHOLD_MS=0,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+)
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Leo')
+
+    def setUp(self):
+        fingerprints.clear()
+        self.guest_client = Client()
+
+    def test_fingerprint_normalizes_literals(self):
+        """Отпечаток не зависит от литералов и длины IN-списков."""
+        first = fingerprint(
+            "SELECT * FROM t WHERE id IN (%s, %s) AND name = 'a'")
+        second = fingerprint(
+            "SELECT  *  FROM t WHERE id IN (%s, %s, %s) AND name = 'b'")
+
+        self.assertEqual(first, second)
+
+    def test_slow_query_logged_with_view_and_plan(self):
+        """Медленный запрос попадает в журнал с view и планом."""
+        with self.assertLogs('yatube.slow_queries') as logs:
+            self.guest_client.get(
+                reverse('posts:profile', kwargs={'username': 'Leo'}))
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        entry = next(
+            entry for entry in entries if 'auth_user' in entry['sql'])
+
+        self.assertEqual(entry['view'], 'posts:profile')
+        self.assertEqual(entry['view_kwargs'], {'username': 'Leo'})
+        self.assertEqual(entry['frame']['module'], 'posts.cache')
+        self.assertTrue(entry['plan'])
+
+    def test_repeated_query_deduplicated(self):
+        """Повторы запроса считаются, но не пишутся каждый раз."""
+        url = reverse('posts:profile', kwargs={'username': 'Leo'})
+        with self.assertLogs('yatube.slow_queries') as logs:
+            for _ in range(3):
+                self.guest_client.get(url)
+        counts = [
+            entry['count'] for entry in (
+                json.loads(record.getMessage()) for record in logs.records)
+            if 'COUNT' in entry['sql'] and 'posts_post' in entry['sql']
+        ]
+
+        self.assertEqual(counts, [1, 2, 4])
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.post = Post.objects.create(
+            text='test-post',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_page_shared_between_users(self):
+        """Страница рендерится один раз, а шапка — для каждого свой."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        guest_response = self.guest_client.get(url)
+        response = self.authorized_client.get(url)
+
+        self.assertTemplateUsed(guest_response, 'posts/post_detail.html')
+        self.assertTemplateNotUsed(response, 'posts/post_detail.html')
+        self.assertContains(guest_response, 'Войти')
+        self.assertNotContains(guest_response, 'редактировать запись')
+        self.assertContains(response, 'Пользователь: Leo')
+        self.assertContains(response, 'редактировать запись')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(response, '<!--# include')
+
+    def test_content_change_resets_pages(self):
+        """Изменение контента сразу сбрасывает общие страницы."""
+        url = reverse('posts:group_posts', kwargs={'slug': 'test-slug'})
+        self.guest_client.get(url)
+        Post.objects.create(
+            text='new-post', author=self.author, group=self.group)
+
+        self.assertContains(self.guest_client.get(url), 'new-post')
+
+    def test_fragment_endpoint(self):
+        """Фрагменты доступны по /fragments/<name>/."""
+        response = self.authorized_client.get(
+            reverse('core:fragment', kwargs={'name': 'follow_button'}),
+            {'username': 'Leo'})
+
+        self.assertContains(response, 'Подписаться')
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_fragment_endpoint_errors(self):
+        """Неизвестный фрагмент или лишние параметры дают 404."""
+        urls = (
+            reverse('core:fragment', kwargs={'name': 'unknown'}),
+            reverse('core:fragment', kwargs={'name': 'header'}) + '?x=1',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    @override_settings(EDGE_SIDE_INCLUDES=True)
+    def test_edge_side_includes(self):
+        """С EDGE_SIDE_INCLUDES вставки остаются для прокси."""
+        response = Client().get(reverse('posts:index'))
+
+        self.assertContains(
+            response,
+            '<!--# include virtual="/fragments/header/?view_name=posts'
+            '%3Aindex" -->')
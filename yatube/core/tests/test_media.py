@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+DATA = bytes(range(256)) * 40
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'), exist_ok=True)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'pic.png'),
+                  'wb') as file:
+            file.write(DATA)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.url = '/media/posts/pic.png'
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''
+        if response.streaming:
+            body = b''.join(response.streaming_content)
+            response.close()
+        return response, body
+
+    def test_full_file(self):
+        """Файл отдается целиком с валидаторами и долгим кэшем."""
+        response, body = self.get(HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, DATA)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Content-Length'], str(len(DATA)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn(
+            f'max-age={settings.MEDIA_CACHE_MAX_AGE}',
+            response['Cache-Control'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_byte_ranges(self):
+        """Диапазон и суффикс возвращают 206 с Content-Range."""
+        response, body = self.get(HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, DATA[10:20])
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(
+            response['Content-Range'], f'bytes 10-19/{len(DATA)}')
+
+        response, body = self.get(HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, DATA[-5:])
+
+        response, body = self.get(HTTP_RANGE='bytes=10240-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(DATA)}')
+
+    def test_if_range_and_multiple_ranges(self):
+        """Устаревший If-Range и несколько диапазонов дают весь файл."""
+        response, body = self.get(
+            HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, DATA)
+
+        response, body = self.get(HTTP_RANGE='bytes=0-9,20-29')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get(self):
+        """Совпавший ETag возвращает 304 без тела."""
+        etag = self.get()[0]['ETag']
+        response, body = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    @override_settings(MEDIA_SENDFILE='x-accel')
+    def test_accel_redirect(self):
+        """С MEDIA_SENDFILE тело файла отдает фронтенд."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/pic.png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+
+    def test_missing_and_outside_files(self):
+        """Отсутствующие файлы и пути вне MEDIA_ROOT — 404."""
+        for url in ('/media/posts/none.png', '/media/../manage.py',
+                    '/media/posts/'):
+            with self.subTest(url=url):
+                self.url = url
+                self.assertEqual(self.get()[0].status_code, 404)
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.metrics import Histogram, registry
+
+User = get_user_model()
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        registry.clear()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_metrics_available_only_for_staff(self):
+        """Метрики доступны только персоналу."""
+        url = reverse('core:metrics')
+
+        self.assertEqual(self.staff_client.get(url).status_code, 200)
+        self.assertEqual(self.authorized_client.get(url).status_code, 302)
+        self.assertEqual(Client().get(url).status_code, 302)
+
+    def test_metrics_grouped_by_view_name(self):
+        """Метрики собираются по имени view."""
+        self.authorized_client.get(reverse('posts:follow_index'))
+        content = self.staff_client.get(reverse('core:metrics')).content
+        content = content.decode()
+
+        for metric in (
+            'yatube_request_duration_seconds',
+            'yatube_db_queries',
+            'yatube_db_duration_seconds',
+            'yatube_template_render_seconds',
+            'yatube_response_size_bytes',
+        ):
+            with self.subTest(metric=metric):
+                self.assertIn(
+                    f'{metric}_count{{view="posts:follow_index"}} 1', content)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Бакеты гистограммы накопительные."""
+        histogram = Histogram('test_seconds', 'test', (1, 2, float('inf')))
+        for value in (0.5, 1.5, 3):
+            histogram.observe('view', value)
+        lines = list(histogram.expose())
+
+        self.assertIn('test_seconds_bucket{view="view",le="1.0"} 1', lines)
+        self.assertIn('test_seconds_bucket{view="view",le="2.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{view="view",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_sum{view="view"} 5.0', lines)
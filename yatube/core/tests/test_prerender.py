@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts.models import Group, Post, User
+
+TEMP_PRERENDER_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(PRERENDER_ROOT=TEMP_PRERENDER_ROOT)
+class PrerenderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_PRERENDER_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(TEMP_PRERENDER_ROOT, ignore_errors=True)
+
+    def read(self, *parts):
+        path = os.path.join(TEMP_PRERENDER_ROOT, *parts, 'index.html')
+        with open(path, encoding='utf-8') as page:
+            return page.read()
+
+    def test_pages_written(self):
+        """about и страницы групп сохраняются со вставками для SSI."""
+        call_command('prerender', stdout=StringIO())
+
+        self.assertIn('<!--# include virtual="/fragments/header/',
+                      self.read('about', 'author'))
+        self.assertIn('test-description', self.read('group', 'test-slug'))
+        self.assertTrue(os.path.exists(
+            os.path.join(TEMP_PRERENDER_ROOT, 'about', 'tech', 'index.html')))
+
+    def test_group_regenerated_on_save(self):
+        """Сохранение группы обновляет заготовку, пост — задача после
+        коммита."""
+        call_command('prerender', stdout=StringIO())
+        group = Group.objects.get(pk=self.group.pk)
+        group.description = 'new-description'
+        group.save()
+        self.assertIn('new-description', self.read('group', 'test-slug'))
+
+        Post.objects.create(
+            text='uncommitted-post', author=self.author, group=group)
+        self.assertNotIn('uncommitted-post', self.read('group', 'test-slug'))
+        with override_settings(TASKS_EXECUTOR='immediate'), mock.patch(
+                'django.db.transaction.on_commit', lambda func: func()):
+            Post.objects.create(
+                text='other-post', author=self.author, group=group)
+        self.assertIn('other-post', self.read('group', 'test-slug'))
+
+        group.slug = 'new-slug'
+        group.save()
+        self.assertIn('new-description', self.read('group', 'new-slug'))
+        self.assertFalse(os.path.exists(
+            os.path.join(TEMP_PRERENDER_ROOT, 'group', 'test-slug')
+            + '/index.html'))
+
+    def test_old_group_regenerated_on_move(self):
+        """Пост, ушедший из группы, пропадает из ее заготовки."""
+        other = Group.objects.create(title='other-group', slug='other-slug')
+        post = Post.objects.create(
+            text='moved-post', author=self.author, group=self.group)
+        call_command('prerender', stdout=StringIO())
+        self.assertIn('moved-post', self.read('group', 'test-slug'))
+
+        with override_settings(TASKS_EXECUTOR='immediate'), mock.patch(
+                'django.db.transaction.on_commit', lambda func: func()):
+            post.group = other
+            post.save()
+        self.assertNotIn('moved-post', self.read('group', 'test-slug'))
+        self.assertIn('moved-post', self.read('group', 'other-slug'))
+
+        with override_settings(TASKS_EXECUTOR='immediate'), mock.patch(
+                'django.db.transaction.on_commit', lambda func: func()):
+            post.group = None
+            post.save()
+        self.assertNotIn('moved-post', self.read('group', 'other-slug'))
+
+    def test_group_not_prerendered_without_command(self):
+        """Без prerender сохранение группы файлов не создает."""
+        Group.objects.get(pk=self.group.pk).save()
+
+        self.assertFalse(os.path.exists(TEMP_PRERENDER_ROOT))
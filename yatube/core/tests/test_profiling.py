@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:profile', kwargs={'username': 'user'})
+
+    def test_staff_gets_profile_report(self):
+        """Персонал получает отчет профилировщика вместо страницы."""
+        reports = {
+            'cpu': 'function calls',
+            'mem': 'KiB',
+            'collapsed': 'posts.views:profile',
+        }
+
+        for mode, expected in reports.items():
+            with self.subTest(mode=mode):
+                response = self.staff_client.get(
+                    self.url, {'_profile': mode})
+
+                self.assertEqual(response['X-Profile'], mode)
+                self.assertIn(expected, response.content.decode())
+
+    def test_header_switch(self):
+        """Профилирование включается и заголовком X-Profile."""
+        response = self.staff_client.get(self.url, HTTP_X_PROFILE='cpu')
+
+        self.assertEqual(response['X-Profile'], 'cpu')
+
+    def test_profiling_inert_for_non_staff(self):
+        """Для обычных пользователей параметр ни на что не влияет."""
+        for client in (self.authorized_client, Client()):
+            with self.subTest(client=client):
+                response = client.get(self.url, {'_profile': 'cpu'})
+
+                self.assertFalse(response.has_header('X-Profile'))
+                self.assertContains(response, 'Все посты пользователя user')
@@ -0,0 +1,61 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.template_profiler import template_profile
+from posts.models import Post
+
+User = get_user_model()
+
+PROFILING_TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+PROFILING_TEMPLATES[0]['OPTIONS']['profiling'] = True
+
+
+@override_settings(TEMPLATES=PROFILING_TEMPLATES)
+class TemplateProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.post = Post.objects.create(author=cls.staff, text='test-post')
+
+    def setUp(self):
+        cache.clear()
+        template_profile.clear()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_nodes_profiled_per_request(self):
+        """Include-ы и свои фильтры попадают в Server-Timing."""
+        response = self.staff_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
+        server_timing = response['Server-Timing']
+
+        self.assertIn("include 'posts/add_comment.html'", server_timing)
+        self.assertIn('posts/post_detail.html template', server_timing)
+
+    def test_slowest_nodes_reported(self):
+        """Самые медленные узлы видны в отчете и в метриках."""
+        self.staff_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
+        nodes = {
+            (template, node)
+            for template, node, _, _ in template_profile.slowest()
+        }
+        report = self.staff_client.get(
+            reverse('core:template_profile')).content.decode()
+        metrics = self.staff_client.get(
+            reverse('core:metrics')).content.decode()
+
+        self.assertIn(
+            ('includes/post_controls.html', 'filter addclass'), nodes)
+        self.assertIn(('posts/post_detail.html', 'tag thumbnail'), nodes)
+        self.assertIn('includes/post_controls.html  filter addclass', report)
+        self.assertIn(
+            'yatube_template_node_renders_total{'
+            'template="includes/post_controls.html",node="filter addclass"} 1',
+            metrics)
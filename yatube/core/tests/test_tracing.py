@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group
+
+TEMP_TRACE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TRACE_LOG = os.path.join(TEMP_TRACE_DIR, 'traces.jsonl')
+
+
+def span_names(span):
+    yield span['name']
+    for child in span.get('children', ()):
+        yield from span_names(child)
+
+
+@override_settings(TRACE_SAMPLE_RATE=1.0)
+class TracingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_TRACE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        handler = logging.FileHandler(TRACE_LOG, mode='w', encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        patcher = mock.patch.object(
+            logging.getLogger('yatube.traces'), 'handlers', [handler])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(handler.close)
+
+    def test_request_traced_as_span_tree(self):
+        """Запрос записывается деревом span-ов."""
+        self.guest_client.get(
+            reverse('posts:group_posts', kwargs={'slug': 'test-slug'}))
+        with open(TRACE_LOG, encoding='utf-8') as log:
+            root = json.loads(log.readlines()[-1])['root']
+        names = set(span_names(root))
+
+        self.assertEqual(root['tags']['view'], 'posts:group_posts')
+        for name in (
+            'view:posts:group_posts',
+            'paginator',
+            'db',
+            'template:posts/group_list.html',
+        ):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+
+    def test_trace_report_summarizes_paths(self):
+        """trace_report выводит самые затратные пути."""
+        self.guest_client.get(
+            reverse('posts:group_posts', kwargs={'slug': 'test-slug'}))
+        out = StringIO()
+        call_command('trace_report', file=TRACE_LOG, stdout=out)
+
+        self.assertIn('Трасс: 1', out.getvalue())
+        self.assertIn(
+            'request:GET > view:posts:group_posts > paginator',
+            out.getvalue())
@@ -0,0 +1,10 @@
+from sorl.thumbnail.base import ThumbnailBackend
+
+from core.tracing import span
+
+
+class TracingThumbnailBackend(ThumbnailBackend):
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        with span('thumbnail', geometry_string):
+            return super().get_thumbnail(file_, geometry_string, **options)
@@ -0,0 +1,95 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from time import perf_counter
+
+from core.db import fingerprint
+
+logger = logging.getLogger('yatube.traces')
+
+_local = threading.local()
+
+
+class Span:
+    __slots__ = ('name', 'label', 'tags', 'start', 'duration', 'children')
+
+    def __init__(self, name, label=None, tags=None):
+        self.name = name
+        self.label = label
+        self.tags = tags
+        self.start = perf_counter()
+        self.duration = None
+        self.children = []
+
+    @property
+    def path_name(self):
+        if self.label is None:
+            return self.name
+        return f'{self.name}:{self.label}'
+
+    def finish(self):
+        self.duration = perf_counter() - self.start
+
+    def to_dict(self, trace_start):
+        data = {
+            'name': self.path_name,
+            'offset_ms': round((self.start - trace_start) * 1000, 3),
+            'ms': round(self.duration * 1000, 3),
+        }
+        if self.tags:
+            data['tags'] = self.tags
+        if self.children:
+            data['children'] = [
+                child.to_dict(trace_start) for child in self.children]
+        return data
+
+
+def active():
+    return getattr(_local, 'span', None) is not None
+
+
+@contextmanager
+def span(name, label=None, **tags):
+    """Дочерний span текущей трассы; вне трассы ничего не делает."""
+    parent = getattr(_local, 'span', None)
+    if parent is None:
+        yield None
+        return
+    child = Span(name, label, tags)
+    parent.children.append(child)
+    _local.span = child
+    try:
+        yield child
+    finally:
+        child.finish()
+        _local.span = parent
+
+
+@contextmanager
+def trace(name, label=None, **tags):
+    """Корневой span; по завершении дерево пишется в журнал трасс."""
+    root = Span(name, label, tags)
+    _local.span = root
+    try:
+        yield root
+    finally:
+        root.finish()
+        _local.span = None
+        logger.info(json.dumps({
+            'trace_id': uuid.uuid4().hex,
+            'timestamp': time.time(),
+            'root': root.to_dict(root.start),
+        }, ensure_ascii=False, default=str))
+
+
+class TracingDatabaseWrapper:
+    """execute_wrapper, оборачивающий каждый SQL-запрос в span."""
+
+    def __call__(self, execute, sql, params, many, context):
+        if not active():
+            return execute(sql, params, many, context)
+        with span('db', sql=fingerprint(sql)):
+            return execute(sql, params, many, context)
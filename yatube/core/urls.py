@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('metrics/', views.metrics, name='metrics'),
+    path(
+        'metrics/templates/',
+        views.template_profile_report,
+        name='template_profile'),
+    path('fragments/<slug:name>/', views.fragment, name='fragment'),
+]
@@ -1,4 +1,21 @@
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from core.fragments import render_fragment
+from core.media import (
+    FileRange, byte_range, content_type, file_etag, media_file,
+)
+from core.metrics import registry
+from core.template_profiler import template_profile
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
 
 
 def page_not_found(request, exception):
@@ -11,3 +28,87 @@ def csrf_failure(request, reason=''):
 
 def internal_server_error(request):
     return render(request, 'core/500.html', {'path': request.path}, status=500)
+
+
+@staff_member_required
+def metrics(request):
+    return HttpResponse(
+        registry.expose(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@staff_member_required
+def template_profile_report(request):
+    lines = [f'{"total, ms":>12} {"count":>8} {"avg, ms":>9}  template  node']
+    for template, node, count, seconds in template_profile.slowest(100):
+        lines.append(
+            f'{seconds * 1000:12.2f} {count:8d} '
+            f'{seconds * 1000 / count:9.3f}  {template}  {node}'
+        )
+    return HttpResponse(
+        '\n'.join(lines) + '\n', content_type='text/plain; charset=utf-8')
+
+
+def fragment(request, name):
+    response = HttpResponse(render_fragment(request, name, request.GET.dict()))
+    patch_cache_control(response, private=True)
+    return response
+
+
+@require_safe
+def media(request, path):
+    """Отдает загруженный файл из MEDIA_ROOT.
+
+    Ответ несет сильный ETag, Last-Modified и долгий Cache-Control,
+    поддерживает Range с одним диапазоном и If-Range. Тело — FileResponse,
+    который WSGI-сервер отдает через sendfile; с MEDIA_SENDFILE это
+    делает фронтенд по X-Accel-Redirect (nginx) или X-Sendfile.
+    """
+    full_path, status = media_file(path)
+    etag = file_etag(status)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(status.st_mtime),
+        'Accept-Ranges': 'bytes',
+    }
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(status.st_mtime))
+    if response is None:
+        response = media_response(request, path, full_path, status, etag)
+    for header, value in headers.items():
+        response.setdefault(header, value)
+    patch_cache_control(
+        response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def media_response(request, path, full_path, status, etag):
+    mode = settings.MEDIA_SENDFILE
+    if mode == 'x-accel':
+        response = HttpResponse(content_type=content_type(full_path))
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(path))
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type(full_path))
+        response['X-Sendfile'] = full_path
+        return response
+    size = status.st_size
+    if_range = request.META.get('HTTP_IF_RANGE')
+    header = request.META.get('HTTP_RANGE')
+    try:
+        requested = byte_range(header, size) if header else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(full_path, 'rb')
+    if requested is None or (if_range and if_range != etag):
+        return FileResponse(file, content_type=content_type(full_path))
+    start, end = requested
+    response = FileResponse(
+        FileRange(file, start, end - start + 1),
+        content_type=content_type(full_path), status=206)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
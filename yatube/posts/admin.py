@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import Comment, Follow, Group, Notification, Post
 
 
 @admin.register(Post)
@@ -30,3 +30,10 @@ class FollowAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'author')
     search_fields = ('user', 'author')
     list_filter = ('user', 'author')
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'post', 'created', 'is_read', 'digested')
+    list_filter = ('is_read', 'digested')
+    raw_id_fields = ('user', 'post')
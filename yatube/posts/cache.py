@@ -0,0 +1,189 @@
+from django.core.cache import cache
+from django.db import router
+from django.http import Http404
+
+from core.cache import invalidate_copies
+
+from posts.models import Follow, Group, Notification, Post, User
+
+OBJECT_TIMEOUT = 60 * 15
+FOLLOWS_TIMEOUT = 60 * 60
+UNREAD_TIMEOUT = 60 * 60
+HIGH_WATER_KEY = 'posts:high_water'
+
+# Модель -> уникальные поля для поиска, FK, которые подставляются
+# из этого же кэша, и поля, которые попадают в кэш (по умолчанию все).
+# У пользователя кэшируются только поля, видимые на страницах: пароль и
+# email не должны оседать в общем кэше и переживать удаление из базы.
+CACHED_MODELS = {
+    Post: {'lookups': ('pk',), 'related': {'author': User, 'group': Group}},
+    Group: {'lookups': ('pk', 'slug'), 'related': {}},
+    User: {
+        'lookups': ('pk', 'username'),
+        'related': {},
+        'fields': ('id', 'username', 'first_name', 'last_name'),
+    },
+}
+
+
+def object_key(model, field, value):
+    return f'object:{model._meta.label_lower}:{field}:{value}'
+
+
+def _attach_related(model, objects):
+    for field, related_model in CACHED_MODELS[model]['related'].items():
+        ids = {
+            getattr(obj, f'{field}_id') for obj in objects
+            if getattr(obj, f'{field}_id') is not None
+        }
+        related = get_many(related_model, ids)
+        for obj in objects:
+            related_id = getattr(obj, f'{field}_id')
+            if related_id in related:
+                setattr(obj, field, related[related_id])
+    return objects
+
+
+def _dump(model, obj):
+    """Объект или, если у модели задан ``fields``, кортеж этих полей."""
+    fields = CACHED_MODELS[model].get('fields')
+    if fields is None:
+        return obj
+    return tuple(getattr(obj, field) for field in fields)
+
+
+def _load(model, value):
+    """Объект из ``_dump``; остальные поля догружаются из базы.
+
+    Целый объект мог остаться в кэше от прежней версии и отдается как
+    есть до истечения OBJECT_TIMEOUT.
+    """
+    fields = CACHED_MODELS[model].get('fields')
+    if fields is None or isinstance(value, model):
+        return value
+    return model.from_db(router.db_for_read(model), fields, value)
+
+
+def _store(model, objects):
+    data = {
+        object_key(model, 'pk', obj.pk): _dump(model, obj) for obj in objects}
+    for field in CACHED_MODELS[model]['lookups']:
+        if field != 'pk':
+            data.update(
+                (object_key(model, field, getattr(obj, field)), obj.pk)
+                for obj in objects)
+    cache.set_many(data, OBJECT_TIMEOUT)
+
+
+def get_many(model, ids):
+    """Объекты по первичным ключам: {pk: объект}, пропуски из БД."""
+    keys = {object_key(model, 'pk', pk): pk for pk in ids}
+    found = {
+        keys[key]: _load(model, value)
+        for key, value in cache.get_many(list(keys)).items()}
+    missing = [pk for pk in keys.values() if pk not in found]
+    if missing:
+        loaded = model._default_manager.in_bulk(missing)
+        _store(model, loaded.values())
+        found.update(loaded)
+    _attach_related(model, list(found.values()))
+    return found
+
+
+def get_cached(model, **lookup):
+    """Объект по pk или уникальному полю из CACHED_MODELS.
+
+    По уникальному полю в кэше лежит только pk. Сигналы сбрасывают
+    записи по текущим значениям полей, а старое значение после
+    переименования не совпадет с объектом, и поиск уйдет в базу.
+    """
+    (field, value), = lookup.items()
+    if field in ('pk', 'id'):
+        found = get_many(model, [int(value)])
+        if not found:
+            raise model.DoesNotExist
+        return found[int(value)]
+    if field not in CACHED_MODELS[model]['lookups']:
+        raise ValueError(f'{field} не кэшируется для {model.__name__}')
+    pk = cache.get(object_key(model, field, value))
+    if pk is not None:
+        obj = get_many(model, [pk]).get(pk)
+        if obj is not None and getattr(obj, field) == value:
+            return obj
+    obj = model._default_manager.get(**{field: value})
+    _store(model, [obj])
+    return _attach_related(model, [obj])[0]
+
+
+def get_cached_or_404(model, **lookup):
+    try:
+        return get_cached(model, **lookup)
+    except (model.DoesNotExist, ValueError):
+        raise Http404(f'{model._meta.object_name} не найден.')
+
+
+def invalidate(model, obj):
+    """Сбрасывает объект и ссылки на него по его уникальным полям."""
+    cache.delete_many([
+        object_key(model, field, getattr(obj, field))
+        for field in CACHED_MODELS[model]['lookups']
+    ])
+
+
+def follows_key(user_id):
+    return f'follows:{user_id}'
+
+
+def followed_ids(user):
+    """Множество id авторов, на которых подписан пользователь."""
+    if not user.is_authenticated:
+        return frozenset()
+    key = follows_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user=user).values_list(
+                'author_id', flat=True))
+        cache.set(key, ids, FOLLOWS_TIMEOUT)
+    return ids
+
+
+def invalidate_follows(user_id):
+    cache.delete(follows_key(user_id))
+
+
+def unread_key(user_id):
+    return f'unread:{user_id}'
+
+
+def unread_count(user):
+    """Число непрочитанных уведомлений — одно обращение к кэшу."""
+    if not user.is_authenticated:
+        return 0
+    key = unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            user=user, is_read=False).count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def invalidate_unread(user_ids):
+    cache.delete_many([unread_key(user_id) for user_id in user_ids])
+
+
+def post_high_water():
+    """(id, pub_date) последнего созданного поста или None.
+
+    Метка для потоков событий и API ``since``. Ее опрашивает каждый
+    поток раз в секунду, поэтому она читается из локального уровня
+    TwoTierCache: общий кэш процесс сверяет одним запросом за интервал
+    проверки версий, сколько бы потоков ни было открыто.
+    """
+    return cache.get(HIGH_WATER_KEY)
+
+
+def set_post_high_water(post):
+    cache.set(HIGH_WATER_KEY, (post.pk, post.pub_date), None)
+    invalidate_copies([HIGH_WATER_KEY])
@@ -4,11 +4,23 @@ from posts.models import Comment, Post
 
 
 class PostForm(forms.ModelForm):
+    """Форма поста; ``upload_errors`` — ошибки ImageUploadHandler."""
+
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
 
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
 
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_errors.items():
+            if field in self.fields:
+                self.add_error(field, message)
+        return cleaned_data
+
     def clean_subject(self):
         data = self.cleaned_data['text']
         if len(data) == 0:
@@ -0,0 +1,23 @@
+from django.template.loader import render_to_string
+
+from core.fragments import fragment
+from posts.cache import get_cached_or_404
+from posts.forms import CommentForm
+from posts.models import Post, User
+
+
+@fragment('post_controls')
+def post_controls(request, post_id):
+    post = get_cached_or_404(Post, pk=post_id)
+    context = {'post': post, 'form': CommentForm()}
+    return render_to_string('includes/post_controls.html', context, request)
+
+
+@fragment('follow_button')
+def follow_button(request, username):
+    author = get_cached_or_404(User, username=username)
+    context = {
+        'author': author,
+        'following': author.pk in request.followed_ids,
+    }
+    return render_to_string('includes/follow_button.html', context, request)
@@ -0,0 +1,53 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from core import prerender
+from posts import notifications
+from posts.models import Group, Post
+from posts.utils import group_url
+from tasks.models import Job
+from tasks.queue import task
+
+# Геометрии {% thumbnail %} из шаблонов постов.
+THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+
+@task(priority=-1)
+def generate_thumbnails(post_id):
+    """Заранее создает миниатюры картинки поста для шаблонов."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    for geometry, options in THUMBNAILS:
+        get_thumbnail(post.image, geometry, **options)
+
+
+@task(priority=-1)
+def prerender_group_page(group_id):
+    """Обновляет заготовку страницы группы, если она есть."""
+    slug = Group.objects.filter(
+        pk=group_id).values_list('slug', flat=True).first()
+    url = group_url(slug) if slug else None
+    if url and prerender.is_prerendered(url):
+        prerender.prerender(url)
+
+
+@task
+def notify_followers(post_id):
+    """Уведомляет подписчиков о посте и планирует ближайший дайджест."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not notifications.notify_followers(post):
+        return
+    scheduled = Job.objects.filter(
+        name=send_digests.name, status=Job.QUEUED).exists()
+    if not scheduled:
+        send_digests.enqueue(
+            countdown=settings.NOTIFICATION_DIGEST_INTERVAL)
+
+
+@task(priority=-5)
+def send_digests():
+    """Рассылает накопленные уведомления одним письмом на пользователя."""
+    notifications.send_digests(settings.NOTIFICATION_DIGEST_BATCH)
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from posts.media_gc import BATCH_SIZE, MIN_AGE, MediaCollector
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов и миниатюры sorl-thumbnail, на которые '
+        'больше нет ссылок, из MEDIA_ROOT и KV-хранилища.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только перечислить сирот, ничего не удаляя.')
+        parser.add_argument(
+            '--min-age', type=int, default=MIN_AGE,
+            help='Не трогать файлы моложе стольких секунд.')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько файлов сверять с базой одним запросом.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        verbose = dry_run or options['verbosity'] > 1
+        collector = MediaCollector(
+            dry_run=dry_run,
+            min_age=options['min_age'],
+            batch_size=options['batch_size'],
+            on_orphan=self.stdout.write if verbose else None,
+        )
+        stats = collector.run()
+        seconds = stats['seconds']
+        action = 'Найдено' if dry_run else 'Удалено'
+        self.stdout.write(
+            f'Просмотрено файлов: {stats["files"]} за {seconds:.2f} с '
+            f'({stats["files"] / max(seconds, 1e-6):.0f} файлов/с)')
+        self.stdout.write(
+            f'{action} файлов без ссылок: {stats["orphans"]} '
+            f'({filesizeformat(stats["bytes"])}), моложе --min-age: '
+            f'{stats["recent"]}, вне каталогов картинок: '
+            f'{stats["skipped"]}')
+        self.stdout.write(
+            f'{action} записей KV-хранилища без постов: '
+            f'{stats["kv_orphans"]} из {stats["kv_images"]}')
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает дайджесты накопленных уведомлений о новых постах.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.NOTIFICATION_DIGEST_BATCH,
+            help='Сколько писем отправлять через одно соединение.')
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['batch_size'])
+        self.stdout.write(f'Отправлено дайджестов: {sent}')
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.urls import reverse
+
+from core import internal
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кэш страниц: первые страницы ленты, самые большие '
+        'группы и профили самых активных авторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--index-pages', type=int, default=3,
+            help='Сколько первых страниц главной прогреть.')
+        parser.add_argument(
+            '--groups', type=int, default=10,
+            help='Сколько групп с наибольшим числом постов прогреть.')
+        parser.add_argument(
+            '--profiles', type=int, default=10,
+            help='Сколько профилей с наибольшим числом постов прогреть.')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Размер пула потоков; 1 — прогревать последовательно.')
+        parser.add_argument(
+            '--host', default=settings.ALLOWED_HOSTS[0],
+            help='Host, под которым страницы запрашивают пользователи.')
+        parser.add_argument(
+            '--secure', action='store_true',
+            help='Запрашивать страницы как https.')
+
+    def urls(self, options):
+        index = reverse('posts:index')
+        yield index
+        for page in range(2, options['index_pages'] + 1):
+            yield f'{index}?page={page}'
+        groups = Group.objects.annotate(
+            posts_count=Count('group_posts')).order_by('-posts_count')
+        for slug in groups.values_list('slug', flat=True)[:options['groups']]:
+            yield reverse('posts:group_posts', kwargs={'slug': slug})
+        authors = User.objects.annotate(
+            posts_count=Count('posts')).order_by('-posts_count')
+        for username in authors.values_list(
+                'username', flat=True)[:options['profiles']]:
+            yield reverse('posts:profile', kwargs={'username': username})
+
+    def fetch(self, url):
+        start = perf_counter()
+        response = internal.get(url, self.host, self.secure)
+        return url, response.status_code, perf_counter() - start
+
+    def fetch_in_thread(self, url):
+        try:
+            return self.fetch(url)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        self.host = options['host']
+        self.secure = options['secure']
+        urls = list(self.urls(options))
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(options['workers']) as pool:
+                results = list(pool.map(self.fetch_in_thread, urls))
+        else:
+            results = [self.fetch(url) for url in urls]
+        for url, status, seconds in results:
+            self.stdout.write(f'{status} {seconds * 1000:8.1f} ms  {url}')
+        self.stdout.write(f'Прогрето страниц: {len(results)}')
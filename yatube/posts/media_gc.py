@@ -0,0 +1,152 @@
+import os
+from collections import Counter
+from itertools import islice
+from time import perf_counter, time
+
+from django.conf import settings
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from posts.models import Post
+
+BATCH_SIZE = 500
+# Файлы моложе MIN_AGE секунд не трогаем: картинка уже записана, а пост
+# с ней еще может быть не сохранен.
+MIN_AGE = 60 * 60
+
+
+def scan(root):
+    """(относительный путь, os.DirEntry) всех файлов под ``root``.
+
+    Обход идет через os.scandir, без списка всего дерева в памяти.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, root)
+                    yield name.replace(os.sep, '/'), entry
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def referenced(names):
+    """Имена из ``names``, на которые ссылается Post.image."""
+    return set(
+        Post.objects.filter(image__in=list(names))
+        .values_list('image', flat=True))
+
+
+class MediaCollector:
+    """Ищет и удаляет картинки и миниатюры, на которые нет ссылок.
+
+    Сначала из KV-хранилища sorl удаляются записи картинок, которых нет
+    ни в одном посте, вместе с их миниатюрами. Затем MEDIA_ROOT
+    обходится пачками по ``batch_size`` файлов: картинки из каталога
+    Post.image сверяются с постами одним запросом на пачку, миниатюры —
+    с KV-хранилищем. Остальные каталоги не трогаются. С ``dry_run``
+    ничего не удаляется, только считается. ``on_orphan(name)``
+    вызывается для каждого найденного сироты.
+    """
+
+    def __init__(self, *, dry_run=False, min_age=MIN_AGE,
+                 batch_size=BATCH_SIZE, on_orphan=None):
+        self.dry_run = dry_run
+        self.min_age = min_age
+        self.batch_size = batch_size
+        self.on_orphan = on_orphan
+        self.stats = Counter()
+
+    def run(self):
+        start = perf_counter()
+        self.collect_kvstore()
+        self.collect_files()
+        self.stats['seconds'] = perf_counter() - start
+        return self.stats
+
+    def collect_kvstore(self):
+        prefix = add_prefix('', 'image')
+        last_key = ''
+        while True:
+            rows = list(
+                KVStore.objects
+                .filter(key__startswith=prefix, key__gt=last_key)
+                .order_by('key')
+                .values_list('key', 'value')[:self.batch_size])
+            if not rows:
+                return
+            last_key = rows[-1][0]
+            images = [
+                image for image in map(deserialize_image_file,
+                                       (value for _, value in rows))
+                if not image.name.startswith(
+                    thumbnail_settings.THUMBNAIL_PREFIX)
+            ]
+            self.stats['kv_images'] += len(images)
+            used = referenced(image.name for image in images)
+            for image in images:
+                if image.name in used:
+                    continue
+                self.stats['kv_orphans'] += 1
+                self.report(image.name)
+                if not self.dry_run:
+                    default.kvstore.delete(image)
+
+    def collect_files(self):
+        upload_to = Post._meta.get_field('image').upload_to
+        thumbnails = thumbnail_settings.THUMBNAIL_PREFIX
+        for batch in batched(scan(settings.MEDIA_ROOT), self.batch_size):
+            self.stats['files'] += len(batch)
+            images = {
+                name: entry for name, entry in batch
+                if name.startswith(upload_to)
+            }
+            thumbs = {
+                add_prefix(ImageFile(name, default.storage).key): (name, entry)
+                for name, entry in batch if name.startswith(thumbnails)
+            }
+            self.stats['skipped'] += len(batch) - len(images) - len(thumbs)
+            used = referenced(images)
+            known = set(
+                KVStore.objects.filter(key__in=list(thumbs))
+                .values_list('key', flat=True))
+            for name, entry in images.items():
+                if name not in used:
+                    self.remove(name, entry)
+            for key, (name, entry) in thumbs.items():
+                if key not in known:
+                    self.remove(name, entry)
+
+    def remove(self, name, entry):
+        status = entry.stat(follow_symlinks=False)
+        if time() - status.st_mtime < self.min_age:
+            self.stats['recent'] += 1
+            return
+        self.stats['orphans'] += 1
+        self.stats['bytes'] += status.st_size
+        self.report(name)
+        if not self.dry_run:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def report(self, name):
+        if self.on_orphan is not None:
+            self.on_orphan(name)
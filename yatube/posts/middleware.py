@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.cache import followed_ids, unread_count
+
+
+class FollowMiddleware:
+    """Добавляет в запрос ленивые ``request.followed_ids`` и
+    ``request.unread_notifications`` — счетчик для шапки."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.followed_ids = SimpleLazyObject(
+            lambda: followed_ids(request.user))
+        request.unread_notifications = SimpleLazyObject(
+            lambda: unread_count(request.user))
+        return self.get_response(request)
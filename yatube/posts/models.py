@@ -113,3 +113,45 @@ class Follow(models.Model):
 
     def __str__(self):
         return self.user
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата уведомления')
+    is_read = models.BooleanField(
+        default=False,
+        verbose_name='Прочитано')
+    digested = models.BooleanField(
+        default=False,
+        verbose_name='Отправлено в дайджесте')
+
+    class Meta:
+        verbose_name = 'notification'
+        verbose_name_plural = 'notifications'
+        ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=('user', 'is_read'), name='posts_notif_unread'),
+            models.Index(
+                fields=('digested', 'user'), name='posts_notif_digest'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique notification')
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
@@ -0,0 +1,107 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from posts.cache import invalidate_unread
+from posts.models import Follow, Notification
+
+BATCH_SIZE = 500
+
+
+def notify_followers(post):
+    """Создает уведомления о посте всем подписчикам автора.
+
+    Подписчики читаются пачками по BATCH_SIZE, и на каждую пачку
+    уходит один INSERT; возвращает число уведомлений.
+    """
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    count = 0
+    batch = []
+    for user_id in follower_ids.iterator(chunk_size=BATCH_SIZE):
+        batch.append(user_id)
+        if len(batch) == BATCH_SIZE:
+            count += _create(post, batch)
+            batch = []
+    if batch:
+        count += _create(post, batch)
+    return count
+
+
+def _create(post, user_ids):
+    Notification.objects.bulk_create(
+        [Notification(user_id=user_id, post=post) for user_id in user_ids],
+        ignore_conflicts=True)
+    invalidate_unread(user_ids)
+    return len(user_ids)
+
+
+def mark_read(user):
+    """Отмечает уведомления прочитанными; в дайджест они уже не попадут."""
+    if Notification.objects.filter(user=user, is_read=False).update(
+            is_read=True, digested=True):
+        invalidate_unread([user.pk])
+
+
+def site_url(path):
+    return f'http://{settings.ALLOWED_HOSTS[0]}{path}'
+
+
+def digest_message(user, notifications):
+    posts = [
+        (notification.post, site_url(reverse(
+            'posts:post_detail',
+            kwargs={'post_id': notification.post_id})))
+        for notification in notifications
+    ]
+    body = render_to_string('posts/digest_email.txt', {
+        'user': user,
+        'posts': posts,
+        'follow_url': site_url(reverse('posts:follow_index')),
+    })
+    return EmailMessage(
+        f'Yatube: новых постов от ваших авторов — {len(posts)}',
+        body,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+    )
+
+
+def send_digests(batch_size=100):
+    """Отправляет по письму на пользователя с новыми уведомлениями.
+
+    Пользователи обрабатываются пачками по ``batch_size``: на пачку —
+    один запрос уведомлений и одно соединение EMAIL_BACKEND для всех
+    писем. Возвращает число отправленных писем.
+    """
+    user_ids = list(
+        Notification.objects.filter(digested=False).order_by(
+            'user_id').values_list('user_id', flat=True).distinct())
+    sent = 0
+    for start in range(0, len(user_ids), batch_size):
+        sent += _send_batch(user_ids[start:start + batch_size])
+    return sent
+
+
+def _send_batch(user_ids):
+    notifications = list(
+        Notification.objects.filter(
+            user_id__in=user_ids, digested=False,
+        ).select_related('user', 'post__author').order_by(
+            'user_id', '-created'))
+    messages = []
+    for _, group in groupby(notifications, key=lambda n: n.user_id):
+        group = list(group)
+        user = group[0].user
+        if user.email:
+            messages.append(digest_message(user, group))
+    if messages:
+        with get_connection() as connection:
+            connection.send_messages(messages)
+    Notification.objects.filter(
+        pk__in=[notification.pk for notification in notifications],
+    ).update(digested=True)
+    return len(messages)
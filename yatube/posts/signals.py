@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.db import transaction
+from django.dispatch import receiver
+
+from core import prerender
+from core.cache import bump_page_generation
+from posts.cache import (
+    CACHED_MODELS, invalidate, invalidate_follows, object_key,
+    set_post_high_water,
+)
+from posts.jobs import notify_followers, prerender_group_page
+from posts.models import Comment, Follow, Group, Post, User
+from posts.utils import group_url
+
+
+def invalidate_instance(sender, instance, **kwargs):
+    invalidate(sender, instance)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(
+        invalidate_instance, sender=model,
+        dispatch_uid=f'invalidate_{model._meta.label_lower}_save')
+    post_delete.connect(
+        invalidate_instance, sender=model,
+        dispatch_uid=f'invalidate_{model._meta.label_lower}_delete')
+
+
+@receiver(pre_delete, sender=Group, dispatch_uid='invalidate_group_posts')
+def invalidate_group_posts(sender, instance, **kwargs):
+    """SET_NULL обновляет посты без сигналов, поэтому сбрасываем их здесь."""
+    cache.delete_many([
+        object_key(Post, 'pk', pk)
+        for pk in instance.group_posts.values_list('pk', flat=True)
+    ])
+
+
+@receiver(post_save, sender=Follow, dispatch_uid='invalidate_follows_save')
+@receiver(
+    post_delete, sender=Follow, dispatch_uid='invalidate_follows_delete')
+def follow_changed(sender, instance, **kwargs):
+    invalidate_follows(instance.user_id)
+
+
+@receiver(post_save, sender=Post, dispatch_uid='notify_followers')
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        notify_followers.delay(instance.pk)
+        transaction.on_commit(lambda: set_post_high_water(instance))
+
+
+def content_changed(sender, instance, update_fields=None, **kwargs):
+    """Сбрасывает общие страницы, если изменилось видимое на них."""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_page_generation()
+
+
+for model in (Post, Group, User, Comment):
+    post_save.connect(
+        content_changed, sender=model,
+        dispatch_uid=f'pages_{model._meta.label_lower}_save')
+    post_delete.connect(
+        content_changed, sender=model,
+        dispatch_uid=f'pages_{model._meta.label_lower}_delete')
+
+
+@receiver(pre_save, sender=Group, dispatch_uid='prerender_group_renamed')
+def prerender_group_renamed(sender, instance, **kwargs):
+    """При смене slug заготовка переезжает на новый адрес."""
+    if instance.pk is None:
+        return
+    slug = Group.objects.filter(
+        pk=instance.pk).values_list('slug', flat=True).first()
+    url = group_url(slug) if slug and slug != instance.slug else None
+    if url and prerender.is_prerendered(url):
+        prerender.remove(url)
+        instance._prerender_moved = True
+
+
+@receiver(post_save, sender=Group, dispatch_uid='prerender_group')
+def prerender_group(sender, instance, **kwargs):
+    """Обновляет страницу группы, если она заготовлена prerender."""
+    url = group_url(instance.slug)
+    if url is None:
+        return
+    moved = getattr(instance, '_prerender_moved', False)
+    if moved or prerender.is_prerendered(url):
+        prerender.prerender(url)
+
+
+@receiver(post_delete, sender=Group, dispatch_uid='remove_prerendered_group')
+def remove_prerendered_group(sender, instance, **kwargs):
+    url = group_url(instance.slug)
+    if url is not None:
+        prerender.remove(url)
+
+
+@receiver(pre_save, sender=Post, dispatch_uid='prerender_post_moved')
+def prerender_post_moved(sender, instance, **kwargs):
+    """Запоминает прежнюю группу поста: ее заготовку тоже нужно обновить."""
+    if instance.pk is None:
+        return
+    instance._prerender_old_group_id = Post.objects.filter(
+        pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post, dispatch_uid='prerender_post_group')
+@receiver(post_delete, sender=Post, dispatch_uid='prerender_post_group_del')
+def prerender_post_group(sender, instance, **kwargs):
+    """Заготовки новой и прежней группы перерисовывает задача уже после
+    коммита."""
+    group_ids = {
+        instance.group_id,
+        getattr(instance, '_prerender_old_group_id', None),
+    } - {None}
+    for group_id in group_ids:
+        transaction.on_commit(
+            lambda group_id=group_id: prerender_group_page.delay(group_id))
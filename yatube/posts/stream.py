@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import post_high_water
+
+BATCH_SIZE = 50
+FIELDS = ('pk', 'text', 'pub_date', 'author__username', 'group__slug')
+
+
+def post_data(post):
+    """Краткое описание поста из ``values(*FIELDS)`` для JSON."""
+    return {
+        'id': post['pk'],
+        'author': post['author__username'],
+        'group': post['group__slug'],
+        'text': post['text'][:200],
+        'pub_date': post['pub_date'].isoformat(),
+        'url': reverse('posts:post_detail', kwargs={'post_id': post['pk']}),
+    }
+
+
+def event(post):
+    """Событие SSE ``post`` с кратким описанием поста."""
+    data = json.dumps(post_data(post), ensure_ascii=False)
+    return f'id: {post["pk"]}\nevent: post\ndata: {data}\n\n'
+
+
+def parse_cursor(params):
+    """Курсор ``?since_id=<id>`` или ``?since=<ISO 8601>``; None без него.
+
+    Возвращает пару (поле, значение) для запроса ``<поле>__gt``.
+    """
+    if params.get('since_id'):
+        if not params['since_id'].isdigit():
+            raise ValueError('since_id должен быть числом.')
+        return 'pk', int(params['since_id'])
+    if params.get('since'):
+        since = parse_datetime(params['since'])
+        if since is None:
+            raise ValueError('since должен быть датой в формате ISO 8601.')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return 'pub_date', since
+    return None
+
+
+def is_behind(cursor, mark):
+    """True, если после курсора по метке ``post_high_water`` есть посты."""
+    field, value = cursor
+    last_id, last_date = mark
+    return (last_id if field == 'pk' else last_date) > value
+
+
+def posts_since(posts, cursor, limit=BATCH_SIZE):
+    """До ``limit`` постов ленты новее курсора, от старых к новым.
+
+    Запрос — диапазон по первичному ключу или индексу pub_date. Без
+    курсора возвращаются последние ``limit`` постов.
+    """
+    if cursor is None:
+        latest = posts().order_by('-pk').values(*FIELDS)[:limit]
+        return list(reversed(latest))
+    field, value = cursor
+    return list(
+        posts().filter(**{f'{field}__gt': value}).order_by(
+            field, 'pk').values(*FIELDS)[:limit])
+
+
+def post_events(posts, last_id, *, poll_interval, keepalive, duration,
+                clock=time.monotonic, sleep=time.sleep):
+    """Генератор событий о постах ленты ``posts()`` новее ``last_id``.
+
+    Раз в ``poll_interval`` секунд читается только метка
+    ``post_high_water()`` из кэша; запрос к БД делается, лишь когда она
+    сменилась. Через ``duration`` секунд поток закрывается, и браузер
+    переподключается с Last-Event-ID, освобождая воркер.
+    """
+    yield f'retry: {int(poll_interval * 1000)}\n\n'
+    seen = object()
+    started = last_sent = clock()
+    while clock() - started < duration:
+        mark = post_high_water()
+        if mark != seen:
+            seen = mark
+            batch = list(
+                posts().filter(pk__gt=last_id).order_by('pk').values(
+                    *FIELDS)[:BATCH_SIZE])
+            if len(batch) == BATCH_SIZE:
+                seen = object()
+            for post in batch:
+                last_id = post['pk']
+                last_sent = clock()
+                yield event(post)
+        if clock() - last_sent >= keepalive:
+            last_sent = clock()
+            yield ': keepalive\n\n'
+        sleep(poll_interval)
+
+
+class StreamSlots:
+    """Число одновременно открытых потоков в процессе.
+
+    Каждый поток держит воркер, пока открыт, поэтому их число
+    ограничено ``limit``.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def open(self, events, limit):
+        """Поток ``events``, освобождающий место при закрытии ответа,
+        или None, если все места заняты."""
+        with self.lock:
+            if self.count >= limit:
+                return None
+            self.count += 1
+        return SlotStream(self, events)
+
+    def release(self):
+        with self.lock:
+            self.count -= 1
+
+
+class SlotStream:
+    """Итератор событий, занимающий место в ``StreamSlots``.
+
+    Django вызывает ``close()`` по завершении ответа, даже если поток
+    не был прочитан ни разу.
+    """
+
+    def __init__(self, slots, events):
+        self.slots = slots
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.events.close()
+        self.slots.release()
+
+
+open_streams = StreamSlots()
@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.cache import (
+    followed_ids, get_cached, get_cached_or_404, get_many,
+)
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'core.cache_backends.LocMemCache'},
+})
+class ObjectCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.post = Post.objects.create(
+            text='test-post',
+            author=cls.author,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_lookup_without_queries(self):
+        """Повторный поиск по pk и уникальным полям не ходит в базу."""
+        lookups = (
+            (User, {'username': 'Leo'}),
+            (Group, {'slug': 'test-slug'}),
+            (Post, {'pk': self.post.pk}),
+        )
+        for model, lookup in lookups:
+            get_cached(model, **lookup)
+        for model, lookup in lookups:
+            with self.subTest(model=model.__name__):
+                with self.assertNumQueries(0):
+                    obj = get_cached(model, **lookup)
+                self.assertEqual(obj.pk, model.objects.get(**lookup).pk)
+
+    def test_user_cached_without_private_fields(self):
+        """В кэш пользователя не попадают пароль и email."""
+        User.objects.filter(pk=self.author.pk).update(
+            email='leo@example.com', first_name='Lev')
+        get_cached(User, username='Leo')
+
+        cached = cache.get(f'object:auth.user:pk:{self.author.pk}')
+        self.assertNotIn('leo@example.com', cached)
+        self.assertNotIn(self.author.password, cached)
+        with self.assertNumQueries(0):
+            user = get_cached(User, username='Leo')
+            self.assertEqual(user.get_full_name(), 'Lev')
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'leo@example.com')
+
+    def test_post_relations_from_cache(self):
+        """Автор и группа поста подставляются без запросов."""
+        get_cached(Post, pk=self.post.pk)
+        with self.assertNumQueries(0):
+            post = get_cached(Post, pk=self.post.pk)
+            self.assertEqual(post.author.username, 'Leo')
+            self.assertEqual(post.group.slug, 'test-slug')
+
+    def test_save_invalidates(self):
+        """Сохранение объекта сбрасывает его в кэше."""
+        group = get_cached(Group, slug='test-slug')
+        group.title = 'new-title'
+        group.slug = 'new-slug'
+        group.save()
+
+        self.assertEqual(
+            get_cached(Group, slug='new-slug').title, 'new-title')
+        with self.assertRaises(Group.DoesNotExist):
+            get_cached(Group, slug='test-slug')
+
+    def test_delete_invalidates(self):
+        """Удаленный объект больше не отдается из кэша."""
+        post = Post.objects.create(text='deleted', author=self.author)
+        get_cached(Post, pk=post.pk)
+        post_id = post.pk
+        post.delete()
+
+        with self.assertRaises(Http404):
+            get_cached_or_404(Post, pk=post_id)
+
+    def test_group_delete_resets_posts(self):
+        """После удаления группы у поста в кэше нет группы."""
+        get_cached(Post, pk=self.post.pk)
+        Group.objects.get(pk=self.group.pk).delete()
+
+        self.assertIsNone(get_cached(Post, pk=self.post.pk).group)
+
+    def test_get_many(self):
+        """get_many загружает недостающие объекты одним запросом."""
+        other = Post.objects.create(text='other', author=self.author)
+        get_cached(Post, pk=self.post.pk)
+        with self.assertNumQueries(1):
+            posts = get_many(Post, [self.post.pk, other.pk, 0])
+
+        self.assertEqual(set(posts), {self.post.pk, other.pk})
+        with self.assertNumQueries(0):
+            get_many(Post, [self.post.pk, other.pk])
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'core.cache_backends.LocMemCache'},
+})
+class FollowCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.follower = User.objects.create_user(username='Olga')
+        cls.other = User.objects.create_user(username='Ivan')
+        Follow.objects.create(user=cls.other, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.follower)
+
+    def test_followed_ids_cached(self):
+        """Множество подписок загружается из базы один раз."""
+        with self.assertNumQueries(1):
+            followed_ids(self.other)
+        with self.assertNumQueries(0):
+            ids = followed_ids(self.other)
+
+        self.assertEqual(ids, {self.author.pk})
+
+    def test_profile_following_for_current_user(self):
+        """Флаг following зависит от подписок текущего пользователя."""
+        url = reverse('posts:profile', kwargs={'username': 'Leo'})
+        self.assertFalse(self.client.get(url).context['following'])
+
+        self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'Leo'}))
+        self.assertTrue(self.client.get(url).context['following'])
+
+        self.client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': 'Leo'}))
+        self.assertFalse(self.client.get(url).context['following'])
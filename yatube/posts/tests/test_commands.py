@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class WarmCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        User.objects.create_user(username='Olga')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        Group.objects.create(
+            title='empty-group',
+            slug='empty-slug',
+            description='test-description',
+        )
+        Post.objects.create(
+            text='test-post', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hot_pages_warmed(self):
+        """Прогретые страницы отдаются из кэша без рендеринга."""
+        out = StringIO()
+        call_command(
+            'warm_cache', index_pages=1, groups=1, profiles=1, workers=1,
+            host='testserver', stdout=out)
+        warmed = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'Leo'}),
+        )
+
+        self.assertIn('Прогрето страниц: 3', out.getvalue())
+        for url in warmed:
+            with self.subTest(url=url):
+                self.assertIn(url, out.getvalue())
+                response = Client().get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(
+                    any(t.name.startswith('posts/')
+                        for t in response.templates))
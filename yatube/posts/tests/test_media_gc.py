@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from posts.media_gc import MediaCollector
+from posts.models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+OLD = time.time() - 2 * 24 * 60 * 60
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaCollectorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        self.kept = self.source('posts/kept.gif')
+        self.orphan = self.source('posts/orphan.gif')
+        self.kept_thumb = self.thumbnail('cache/aa/kept.jpg', self.kept)
+        self.orphan_thumb = self.thumbnail('cache/bb/orphan.jpg', self.orphan)
+        self.stray_thumb = self.file('cache/cc/stray.jpg')
+        self.other = self.file('avatars/other.png')
+        Post.objects.create(
+            text='test-post', author=self.author, image='posts/kept.gif')
+
+    def path(self, name):
+        return os.path.join(TEMP_MEDIA_ROOT, *name.split('/'))
+
+    def file(self, name, mtime=OLD):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'x' * 10)
+        os.utime(path, (mtime, mtime))
+        return name
+
+    def source(self, name):
+        image = ImageFile(self.file(name), default_storage)
+        image.set_size((10, 10))
+        default.kvstore.set(image)
+        return image
+
+    def thumbnail(self, name, source):
+        thumbnail = ImageFile(self.file(name), default.storage)
+        thumbnail.set_size((5, 5))
+        default.kvstore.set(thumbnail, source)
+        return name
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def test_collects_orphans(self):
+        """Удаляются картинки без постов, их миниатюры и бесхозные файлы."""
+        stats = MediaCollector().run()
+
+        for name in ('posts/kept.gif', self.kept_thumb, self.other):
+            self.assertTrue(self.exists(name), name)
+        for name in ('posts/orphan.gif', self.orphan_thumb, self.stray_thumb):
+            self.assertFalse(self.exists(name), name)
+        self.assertIsNone(default.kvstore.get(self.orphan))
+        self.assertIsNotNone(default.kvstore.get(self.kept))
+        self.assertEqual(stats['kv_orphans'], 1)
+        self.assertEqual(stats['orphans'], 2)
+        self.assertEqual(stats['skipped'], 1)
+
+    def test_dry_run_and_recent_files(self):
+        """С --dry-run ничего не удаляется; свежие файлы не трогаются."""
+        self.file('posts/uploading.gif', mtime=time.time())
+        out = StringIO()
+        call_command('media_gc', dry_run=True, batch_size=2, stdout=out)
+
+        for name in ('posts/orphan.gif', self.orphan_thumb, self.stray_thumb,
+                     'posts/uploading.gif'):
+            self.assertTrue(self.exists(name), name)
+        self.assertIsNotNone(default.kvstore.get(self.orphan))
+        self.assertIn('posts/orphan.gif', out.getvalue())
+        self.assertIn(self.stray_thumb, out.getvalue())
+        self.assertNotIn('posts/kept.gif', out.getvalue())
+        self.assertIn('Найдено файлов без ссылок: 2', out.getvalue())
+        self.assertIn('моложе --min-age: 1', out.getvalue())
+        self.assertIn('файлов/с', out.getvalue())
@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.cache import unread_count
+from posts.models import Follow, Notification, Post
+from posts.notifications import send_digests
+from tasks.models import Job
+
+User = get_user_model()
+
+
+@override_settings(TASKS_EXECUTOR='immediate')
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.followers = [
+            User.objects.create_user(
+                username=f'follower-{index}',
+                email=f'follower-{index}@example.com')
+            for index in range(3)
+        ]
+        Follow.objects.bulk_create([
+            Follow(user=follower, author=cls.author)
+            for follower in cls.followers
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_notifications_created_in_bulk(self):
+        """Новый пост создает уведомления подписчикам одним INSERT."""
+        post = Post.objects.create(text='new-post', author=self.author)
+
+        self.assertEqual(
+            set(Notification.objects.filter(post=post).values_list(
+                'user_id', flat=True)),
+            {follower.pk for follower in self.followers})
+        self.assertTrue(Job.objects.filter(
+            name='posts.jobs.send_digests').exists())
+
+    def test_unread_count_single_cache_lookup(self):
+        """Счетчик непрочитанных читается из кэша без запросов к БД."""
+        Post.objects.create(text='new-post', author=self.author)
+        follower = self.followers[0]
+
+        self.assertEqual(unread_count(follower), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(follower), 1)
+
+        Post.objects.create(text='other-post', author=self.author)
+        self.assertEqual(unread_count(follower), 2)
+
+    def test_follow_index_marks_read(self):
+        """Лента подписок отмечает уведомления прочитанными."""
+        Post.objects.create(text='new-post', author=self.author)
+        client = Client()
+        client.force_login(self.followers[0])
+
+        self.assertContains(
+            client.get(reverse('posts:index')), 'bg-danger')
+        client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread_count(self.followers[0]), 0)
+        self.assertNotContains(
+            client.get(reverse('posts:index')), 'bg-danger')
+
+    def test_unread_count_changes_etag(self):
+        """Новое уведомление меняет ETag страницы с шапкой."""
+        client = Client()
+        client.force_login(self.followers[0])
+        url = reverse('posts:index')
+        etag = client.get(url)['ETag']
+
+        Post.objects.create(text='new-post', author=self.author)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'bg-danger')
+
+    def test_digest_per_user_one_connection(self):
+        """Дайджест — одно письмо на пользователя, одно соединение."""
+        Post.objects.create(text='first-post', author=self.author)
+        Post.objects.create(text='second-post', author=self.author)
+        Notification.objects.filter(user=self.followers[0]).update(
+            is_read=True, digested=True)
+
+        with mock.patch(
+                'django.core.mail.backends.locmem.EmailBackend.open'
+        ) as open_connection:
+            self.assertEqual(send_digests(batch_size=10), 2)
+
+        self.assertEqual(open_connection.call_count, 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['follower-1@example.com', 'follower-2@example.com'])
+        self.assertIn('first-post', mail.outbox[0].body)
+        self.assertIn('second-post', mail.outbox[0].body)
+        self.assertFalse(
+            Notification.objects.filter(digested=False).exists())
+        self.assertEqual(send_digests(), 0)
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.cache import set_post_high_water
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class PostsSinceTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.old_post = Post.objects.create(
+            text='old-post', author=cls.author, group=cls.group)
+        cls.new_post = Post.objects.create(
+            text='new-post', author=cls.author)
+        cls.url = reverse('posts:posts_since')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_only_newer_posts_returned(self):
+        """Возвращаются только посты новее since_id."""
+        response = self.client.get(
+            self.url, {'since_id': self.old_post.pk})
+        data = response.json()
+
+        self.assertEqual(
+            [post['text'] for post in data['posts']], ['new-post'])
+        self.assertEqual(data['since_id'], self.new_post.pk)
+        self.assertFalse(data['has_more'])
+
+    def test_timestamp_cursor(self):
+        """Курсором может быть время публикации."""
+        since = (self.new_post.pub_date - timedelta(microseconds=1))
+        response = self.client.get(self.url, {'since': since.isoformat()})
+
+        self.assertEqual(
+            [post['id'] for post in response.json()['posts']],
+            [self.new_post.pk])
+
+    def test_not_modified_without_db_query(self):
+        """По метке в кэше ответ 304 дается без запроса постов."""
+        set_post_high_water(self.new_post)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url, {'since_id': self.new_post.pk})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'posts_post' in query['sql']
+        ])
+        self.assertEqual(response.content, b'')
+
+    def test_feeds_filtered(self):
+        """Лента группы, профиля и подписок фильтруют посты."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.author)
+        self.client.force_login(follower)
+        cases = (
+            ({'group': 'test-slug'}, ['old-post']),
+            ({'username': 'Leo'}, ['old-post', 'new-post']),
+            ({'feed': 'follow'}, ['old-post', 'new-post']),
+        )
+        for params, texts in cases:
+            with self.subTest(params=params):
+                response = self.client.get(
+                    self.url, {**params, 'since_id': 0})
+                self.assertEqual(
+                    [post['text'] for post in response.json()['posts']],
+                    texts)
+
+    def test_errors(self):
+        """Неверный курсор — 400, лента подписок без входа — 403."""
+        cases = (
+            ({'since_id': 'abc'}, 400),
+            ({'since': 'yesterday'}, 400),
+            ({'feed': 'follow'}, 403),
+            ({'group': 'unknown'}, 404),
+        )
+        for params, status in cases:
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.client.get(self.url, params).status_code, status)
@@ -0,0 +1,161 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.cache import post_high_water, set_post_high_water
+from posts.models import Follow, Group, Post
+from posts.stream import open_streams, post_events
+
+User = get_user_model()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+        self.on_sleep = None
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        if self.on_sleep is not None:
+            self.on_sleep(self.now)
+
+
+class PostStreamTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.post = Post.objects.create(
+            text='old-post', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+
+    def events(self, posts, last_id, duration=5):
+        return list(post_events(
+            posts, last_id, poll_interval=1, keepalive=3,
+            duration=duration, clock=self.clock, sleep=self.clock.sleep))
+
+    def test_new_posts_streamed(self):
+        """Посты новее last_id приходят событиями с id."""
+        def publish(now):
+            if now == 2:
+                post = Post.objects.create(
+                    text='new-post', author=self.author)
+                set_post_high_water(post)
+
+        self.clock.on_sleep = publish
+        chunks = self.events(Post.objects.all, self.post.pk, duration=8)
+        events = [chunk for chunk in chunks if 'event: post' in chunk]
+
+        self.assertEqual(chunks[0], 'retry: 1000\n\n')
+        self.assertEqual(len(events), 1)
+        data = json.loads(events[0].split('data: ')[1])
+        self.assertEqual(data['text'], 'new-post')
+        self.assertEqual(data['author'], 'Leo')
+        self.assertIn(': keepalive\n\n', chunks)
+
+    def test_high_water_read_from_local_tier(self):
+        """Опрос метки потоками не обращается к общему кэшу в БД."""
+        set_post_high_water(self.post)
+        post_high_water()
+
+        with self.assertNumQueries(0):
+            for _ in range(30):
+                self.assertEqual(post_high_water()[0], self.post.pk)
+
+    def test_queries_only_on_high_water_change(self):
+        """Пока метка в кэше не меняется, БД не опрашивается."""
+        set_post_high_water(self.post)
+        with CaptureQueriesContext(connection) as queries:
+            self.events(Post.objects.all, self.post.pk, duration=30)
+        post_queries = [
+            query for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+
+        self.assertEqual(len(post_queries), 1)
+
+    def test_group_feed_filtered(self):
+        """Поток группы не содержит постов других групп."""
+        Post.objects.create(text='other-post', author=self.author)
+        chunks = self.events(self.group.group_posts.all, 0, duration=1)
+
+        self.assertIn('old-post', ''.join(chunks))
+        self.assertNotIn('other-post', ''.join(chunks))
+
+    @override_settings(POST_STREAM_ENABLED=True)
+    def test_stream_view(self):
+        """Эндпоинт отдает text/event-stream без кэширования."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.author)
+        client = Client()
+        client.force_login(follower)
+        response = client.get(
+            reverse('posts:post_stream'), {'feed': 'follow'})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        response.close()
+
+    @override_settings(POST_STREAM_ENABLED=True)
+    def test_stream_view_errors(self):
+        """Лента подписок требует входа, неизвестная группа — 404."""
+        url = reverse('posts:post_stream')
+
+        self.assertEqual(
+            Client().get(url, {'feed': 'follow'}).status_code, 403)
+        self.assertEqual(Client().get(url, {'group': 'none'}).status_code, 404)
+
+    def test_stream_disabled(self):
+        """Без POST_STREAM_ENABLED поток недоступен и не подключается."""
+        self.assertEqual(
+            Client().get(reverse('posts:post_stream')).status_code, 404)
+        response = Client().get(reverse('posts:index'))
+
+        self.assertNotContains(response, 'EventSource')
+
+    @override_settings(POST_STREAM_ENABLED=True, POSTS_PER_PAGE=1)
+    def test_subscribe_on_first_page(self):
+        """Подписка с ``last_id`` новейшего поста — только на 1-й странице."""
+        newest = Post.objects.create(text='newest-post', author=self.author)
+        url = reverse('posts:index')
+
+        self.assertContains(
+            Client().get(url), f'?last_id={newest.pk}')
+        self.assertNotContains(
+            Client().get(url, {'page': 2}), 'EventSource')
+
+    @override_settings(
+        POST_STREAM_ENABLED=True, POST_STREAM_MAX_CONNECTIONS=1,
+        POST_STREAM_BUSY_RETRY=30)
+    def test_stream_limit(self):
+        """Сверх лимита потоков — 503 с retry; закрытие освобождает место."""
+        url = reverse('posts:post_stream')
+        first = Client().get(url)
+        busy = Client().get(url)
+
+        self.assertEqual(busy.status_code, 503)
+        self.assertEqual(busy['Retry-After'], '30')
+        self.assertEqual(busy.content, b'retry: 30000\n\n')
+
+        first.close()
+        second = Client().get(url)
+        self.assertEqual(second.status_code, 200)
+        second.close()
+        self.assertEqual(open_streams.count, 0)
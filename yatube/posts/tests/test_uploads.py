@@ -0,0 +1,97 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post, User
+from posts.uploads import HEADER_SIZE, ImageUploadHandler
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_bytes(size=(50, 50), format='PNG'):
+    file = BytesIO()
+    Image.new('RGB', size, (200, 0, 0)).save(file, format)
+    return file.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Leo')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def create(self, content, name='pic.png'):
+        return self.client.post(reverse('posts:post_create'), {
+            'text': 'test-post',
+            'image': SimpleUploadedFile(name, content, 'image/png'),
+        })
+
+    def test_image_saved_under_content_hash(self):
+        """Картинка сохраняется под именем из хэша содержимого."""
+        content = image_bytes()
+        response = self.create(content, name='Фото.PNG')
+
+        self.assertEqual(response.status_code, 302)
+        image = Post.objects.get().image
+        self.assertEqual(
+            image.name,
+            f'posts/{hashlib.sha256(content).hexdigest()[:32]}.png')
+        self.assertTrue(os.path.exists(image.path))
+
+    @override_settings(POST_IMAGE_MAX_SIZE=100)
+    def test_too_large_file_rejected(self):
+        """Файл больше лимита не сохраняется, форма показывает ошибку."""
+        response = self.create(image_bytes())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('слишком большой', response.context['form'].errors[
+            'image'][0])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_rejected(self):
+        """Картинка больше лимита пикселей отклоняется."""
+        response = self.create(image_bytes())
+
+        self.assertIn('50×50', response.context['form'].errors['image'][0])
+        self.assertFalse(Post.objects.exists())
+
+    def test_not_an_image_rejected(self):
+        """Файл, который не является картинкой, отклоняется."""
+        response = self.create(b'not an image' * 10, name='pic.png')
+
+        self.assertIn('image', response.context['form'].errors)
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_rejected_by_header_before_end(self):
+        """Размеры проверяются по первым байтам, до конца загрузки."""
+        content = image_bytes(size=(400, 400), format='BMP')
+        self.assertGreater(len(content), HEADER_SIZE)
+        request = RequestFactory().post('/')
+        handler = ImageUploadHandler(request)
+        handler.new_file('image', 'pic.bmp', 'image/bmp', None)
+
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(content[:HEADER_SIZE], 0)
+        handler.file.close()
+        self.assertIn('image', request.upload_errors)
@@ -369,3 +369,60 @@ class PaginatorViewsTest(TestCase):
                 count_posts_first_page, settings.POSTS_PER_PAGE)
             self.assertEqual(
                 count_posts_second_page, final_count_posts)
+
+
+class PartialFeedTests(TestCase):
+    TEST_OF_POST = settings.POSTS_PER_PAGE + 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Olga')
+        cls.group = Group.objects.create(
+            title='test-group', slug='test-slug')
+        Post.objects.bulk_create([
+            Post(text=f'test-text {index}', group=cls.group, author=cls.user)
+            for index in range(cls.TEST_OF_POST)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_partial_returns_only_cards(self):
+        """?partial=1 отдает только карточки и адрес следующей пачки."""
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'Olga'}),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.client.get(page, {'partial': 1})
+
+                self.assertEqual(
+                    response.content.decode().count('<article>'),
+                    settings.POSTS_PER_PAGE)
+                self.assertNotContains(response, '<html')
+                self.assertNotContains(response, 'pagination')
+                self.assertEqual(
+                    response['X-Next-Page'], f'{page}?partial=1&page=2')
+
+    def test_last_batch_has_no_next(self):
+        """У последней пачки нет X-Next-Page."""
+        response = self.client.get(
+            reverse('posts:index'), {'partial': 1, 'page': 2})
+
+        self.assertEqual(response.content.decode().count('<article>'), 3)
+        self.assertNotIn('X-Next-Page', response)
+
+    def test_follow_feed_partial(self):
+        """Лента подписок тоже отдается пачками."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.user)
+        self.client.force_login(follower)
+        response = self.client.get(
+            reverse('posts:follow_index'), {'partial': 1})
+
+        self.assertNotContains(response, '<html')
+        self.assertIn('X-Next-Page', response)
@@ -0,0 +1,129 @@
+import hashlib
+import os
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+# Столько байт от начала файла хватает, чтобы прочитать размеры
+# картинки; если заголовок длиннее (большой EXIF), проверка ждет
+# конца загрузки.
+HEADER_SIZE = 64 * 1024
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+
+
+def image_header(file):
+    """(формат, (ширина, высота)) по заголовку без декодирования."""
+    try:
+        with Image.open(file) as image:
+            return image.format, image.size
+    except Exception:
+        return None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Пишет картинку во временный файл, считая sha256 на лету.
+
+    Файл больше POST_IMAGE_MAX_SIZE, не картинка из POST_IMAGE_FORMATS
+    или картинка больше POST_IMAGE_MAX_PIXELS пропускаются сразу, как
+    только это видно: остаток тела запроса читается без записи. Ошибки
+    собираются в ``request.upload_errors`` по именам полей, файл
+    получает имя из хэша содержимого.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.POST_IMAGE_MAX_SIZE
+        self.max_pixels = settings.POST_IMAGE_MAX_PIXELS
+        self.formats = settings.POST_IMAGE_FORMATS
+        if request is not None and not hasattr(request, 'upload_errors'):
+            request.upload_errors = {}
+
+    def reject(self, message):
+        if self.request is not None:
+            self.request.upload_errors[self.field_name] = message
+        raise SkipFile(message)
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.content_length and self.content_length > self.max_size:
+            self.reject(self.too_large())
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra)
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.header = b''
+        self.image = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self.reject(self.too_large())
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+        if self.image is None and len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+            if len(self.header) == HEADER_SIZE:
+                self.check(image_header(BytesIO(self.header)), final=False)
+
+    def file_complete(self, file_size):
+        if self.image is None:
+            self.file.flush()
+            try:
+                self.check(image_header(self.file.temporary_file_path()))
+            except SkipFile:
+                # Отсюда SkipFile парсер уже не ловит: файл просто
+                # не попадает в request.FILES.
+                self.file.close()
+                return None
+        format, _ = self.image
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.name = self.hash.hexdigest()[:32] + EXTENSIONS.get(
+            format, os.path.splitext(self.file_name)[1].lower())
+        self.file.content_hash = self.hash.hexdigest()
+        self.file.image_format, self.file.image_size = self.image
+        return self.file
+
+    def check(self, header, final=True):
+        """Проверяет формат и число пикселей по заголовку."""
+        if header is None:
+            if final:
+                self.reject(
+                    'Загрузите правильное изображение. Файл, который вы '
+                    'загрузили, поврежден или не является изображением.')
+            return
+        format, (width, height) = header
+        if format not in self.formats:
+            self.reject(f'Формат {format} не поддерживается.')
+        if width * height > self.max_pixels:
+            self.reject(
+                f'Изображение {width}×{height} слишком большое: не более '
+                f'{self.max_pixels:,} пикселей.'.replace(',', ' '))
+        self.image = header
+
+    def too_large(self):
+        return (
+            'Файл слишком большой: не более '
+            f'{filesizeformat(self.max_size)}.')
+
+
+def image_uploads(view):
+    """Разбирает файлы запроса через ImageUploadHandler.
+
+    Обработчики нельзя поменять после чтения ``request.POST``, а
+    CsrfViewMiddleware читает его до view, поэтому проверка CSRF
+    переносится внутрь.
+    """
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return csrf_protect(view)(request, *args, **kwargs)
+    return wrapper
@@ -17,6 +17,8 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('stream/', views.post_stream, name='post_stream'),
+    path('since/', views.posts_since_json, name='posts_since'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
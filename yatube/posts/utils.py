@@ -1,9 +1,78 @@
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.shortcuts import render
+from django.urls import NoReverseMatch, reverse
+
+from core.tracing import span
+from posts.cache import followed_ids, get_cached_or_404
+from posts.models import Group, Post, User
 
 
 def paginator(request, posts):
     paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    with span('paginator'):
+        page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def render_feed(request, template_name, context):
+    """Страница ленты, а с ``?partial=1`` — только карточки постов.
+
+    Карточка поста берется из ``posts/cards/`` под тем же именем, а
+    адрес следующей пачки отдается в заголовке X-Next-Page. Для
+    бесконечной прокрутки не нужны шапка, подвал и пагинатор.
+    """
+    if not request.GET.get('partial'):
+        return render(request, template_name, {
+            **context, 'post_stream': settings.POST_STREAM_ENABLED})
+    response = render(request, 'posts/partial.html', {
+        **context,
+        'cards_template': template_name.replace('posts/', 'posts/cards/', 1),
+    })
+    page_obj = context['page_obj']
+    if page_obj.has_next():
+        params = request.GET.copy()
+        params['page'] = page_obj.next_page_number()
+        response['X-Next-Page'] = f'{request.path}?{params.urlencode()}'
+    return response
+
+
+def viewer_state(request):
+    """Состояние пользователя, от которого зависят фрагменты страниц:
+    подписки и счетчик непрочитанных в шапке."""
+    if not request.user.is_authenticated:
+        return ''
+    followed = ','.join(map(str, sorted(request.followed_ids)))
+    return f'{request.user.pk}:{followed}:{request.unread_notifications}'
+
+
+def feed_posts(request):
+    """Функция, возвращающая посты ленты из параметров запроса.
+
+    ``?group=<slug>``, ``?username=<автор>`` или ``?feed=follow``, иначе
+    общая лента. Для ленты подписок без входа возвращает None.
+    """
+    if request.GET.get('feed') == 'follow':
+        if not request.user.is_authenticated:
+            return None
+        user = request.user
+
+        def posts():
+            return Post.objects.filter(author_id__in=followed_ids(user))
+        return posts
+    if request.GET.get('group'):
+        group = get_cached_or_404(Group, slug=request.GET['group'])
+        return group.group_posts.all
+    if request.GET.get('username'):
+        author = get_cached_or_404(User, username=request.GET['username'])
+        return author.posts.all
+    return Post.objects.all
+
+
+def group_url(slug):
+    """Адрес страницы группы или None, если slug не попадает в URL."""
+    try:
+        return reverse('posts:group_posts', kwargs={'slug': slug})
+    except NoReverseMatch:
+        return None
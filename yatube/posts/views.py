@@ -1,78 +1,97 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.db.models import Max
+from django.http import (
+    Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified,
+    JsonResponse, StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.utils.cache import patch_cache_control
 
+from core.cache import cached_page
+from posts.cache import get_cached_or_404, post_high_water
 from posts.forms import CommentForm, PostForm
+from posts.jobs import generate_thumbnails
 from posts.models import Follow, Group, Post, User
-from posts.utils import paginator
+from posts.notifications import mark_read
+from posts.stream import (
+    BATCH_SIZE, is_behind, open_streams, parse_cursor, post_data, post_events,
+    posts_since,
+)
+from posts.uploads import image_uploads
+from posts.utils import feed_posts, paginator, render_feed, viewer_state
 
 
-@cache_page(20)
+@cached_page(20, vary_on=viewer_state, shared=True)
 def index(request):
     posts = Post.objects.all()
     page_obj = paginator(request, posts)
     context = {
         'page_obj': page_obj
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'posts/index.html', context)
 
 
+@cached_page(
+    60 * 5, versioned=True, vary_on=viewer_state, shared=True)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_cached_or_404(Group, slug=slug)
     posts = group.group_posts.all()
     page_obj = paginator(request, posts)
     context = {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(request, 'posts/group_list.html', context)
 
 
+@cached_page(
+    60 * 5, versioned=True, vary_on=viewer_state, shared=True)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_cached_or_404(User, username=username)
     page_obj = paginator(request, author.posts.all())
-    if request.user.is_authenticated:
-        following = author.following.exists()
-    else:
-        following = False
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following,
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'posts/profile.html', context)
 
 
+@cached_page(
+    60 * 5, versioned=True, vary_on=viewer_state, shared=True)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_cached_or_404(Post, pk=post_id)
     posts_count = post.author.posts.count()
-    form = CommentForm(request.POST or None)
     comments = post.comments.all()
     context = {
         'post': post,
         'posts_count': posts_count,
-        'form': form,
         'comments': comments,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@image_uploads
 def post_create(request):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
+        upload_errors=request.upload_errors,
     )
     if request.method == 'POST':
         if form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            if post.image:
+                generate_thumbnails.delay(post.pk)
             return redirect('posts:profile', request.user.username)
     return render(request, 'posts/post_create.html', {'form': form})
 
 
 @login_required
+@image_uploads
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if post.author != request.user:
@@ -81,10 +100,13 @@ def post_edit(request, post_id):
         form = PostForm(
             request.POST,
             files=request.FILES or None,
+            upload_errors=request.upload_errors,
             instance=post,
         )
         if form.is_valid():
             form.save()
+            if post.image and 'image' in form.changed_data:
+                generate_thumbnails.delay(post.pk)
             return redirect('posts:post_detail', post_id)
         return render(request, 'posts/post_create.html', {'form': form})
     elif request.method == 'GET':
@@ -102,7 +124,7 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_cached_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -116,16 +138,17 @@ def add_comment(request, post_id):
 def follow_index(request):
     posts = Post.objects.filter(author__following__user=request.user)
     page_obj = paginator(request, posts)
+    mark_read(request.user)
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
+    author = get_cached_or_404(User, username=username)
     if author != user:
         Follow.objects.get_or_create(user=user, author=author)
     return redirect('posts:profile', username=username)
@@ -134,6 +157,76 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     current_user = request.user
-    author = get_object_or_404(User, username=username)
+    author = get_cached_or_404(User, username=username)
     current_user.follower.filter(author=author).delete()
     return redirect('posts:follow_index')
+
+
+def post_stream(request):
+    """Server-Sent Events о новых постах.
+
+    Лента выбирается как в ``feed_posts``. Точка отсчета —
+    Last-Event-ID или ``?last_id`` из закэшированной страницы; без них
+    поток начинается с постов, созданных после подключения. Без
+    POST_STREAM_ENABLED — 404, при POST_STREAM_MAX_CONNECTIONS открытых
+    потоках в процессе — 503 с интервалом повтора.
+    """
+    if not settings.POST_STREAM_ENABLED:
+        raise Http404
+    posts = feed_posts(request)
+    if posts is None:
+        return HttpResponseForbidden()
+    last_id = request.META.get(
+        'HTTP_LAST_EVENT_ID', request.GET.get('last_id', ''))
+    if not last_id.isdigit():
+        last_id = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+    events = post_events(
+        posts, int(last_id),
+        poll_interval=settings.POST_STREAM_POLL_INTERVAL,
+        keepalive=settings.POST_STREAM_KEEPALIVE,
+        duration=settings.POST_STREAM_DURATION,
+    )
+    stream = open_streams.open(
+        events, settings.POST_STREAM_MAX_CONNECTIONS)
+    if stream is None:
+        retry = settings.POST_STREAM_BUSY_RETRY
+        response = HttpResponse(
+            f'retry: {retry * 1000}\n\n', status=503,
+            content_type='text/event-stream')
+        response['Retry-After'] = retry
+        return response
+    response = StreamingHttpResponse(
+        stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def posts_since_json(request):
+    """JSON с постами ленты новее ``?since_id=`` или ``?since=``.
+
+    Лента выбирается как в ``feed_posts``. Если по метке
+    ``post_high_water`` в кэше новых постов нет, ответ — 304 без
+    обращения к БД; пустая выборка тоже дает 304.
+    """
+    posts = feed_posts(request)
+    if posts is None:
+        return HttpResponseForbidden()
+    try:
+        cursor = parse_cursor(request.GET)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    mark = post_high_water()
+    if cursor is not None and mark is not None and not is_behind(
+            cursor, mark):
+        return HttpResponseNotModified()
+    found = posts_since(posts, cursor)
+    if not found and cursor is not None:
+        return HttpResponseNotModified()
+    response = JsonResponse({
+        'posts': [post_data(post) for post in found],
+        'since_id': found[-1]['pk'] if found else 0,
+        'has_more': cursor is not None and len(found) == BATCH_SIZE,
+    }, json_dumps_params={'ensure_ascii': False})
+    patch_cache_control(response, no_cache=True)
+    return response
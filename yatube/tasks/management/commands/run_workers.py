@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.queue import run_pending
+
+
+def work(stop, poll_interval, burst):
+    """Цикл одного воркера: выполняет задачи, пока не попросят выйти."""
+    connections.close_all()
+    while not stop.is_set():
+        if run_pending(stop):
+            continue
+        if burst:
+            break
+        stop.wait(poll_interval)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Запускает процессы, выполняющие задачи из очереди tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASKS_PROCESSES,
+            help='Число процессов; 1 — работать в текущем процессе.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, когда готовых задач не останется.')
+
+    def handle(self, *args, **options):
+        stop = multiprocessing.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        worker_args = (stop, options['poll_interval'], options['burst'])
+        if options['processes'] <= 1:
+            work(*worker_args)
+            return
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=work, args=worker_args)
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(
+            f'Воркеров: {len(workers)}, pid {os.getpid()}')
+        for worker in workers:
+            worker.join()
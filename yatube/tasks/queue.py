@@ -0,0 +1,180 @@
+import json
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tasks.models import Job
+
+logger = logging.getLogger('yatube.tasks')
+
+registry = {}
+
+WORKER_LOST = 'Воркер пропал, не завершив задачу: превышен TASKS_JOB_TIMEOUT.'
+
+
+class Task:
+    """Функция, которую можно поставить в очередь через ``delay``."""
+
+    def __init__(self, func, name, max_attempts, priority):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.priority = priority
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, *, priority=None, countdown=0):
+        """Ставит задачу в очередь; ``countdown`` — задержка в секундах."""
+        job = Job.objects.create(
+            name=self.name,
+            payload=json.dumps({'args': list(args), 'kwargs': kwargs or {}}),
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_at=timezone.now() + timedelta(seconds=countdown),
+        )
+        if not countdown:
+            dispatch(job)
+        return job
+
+
+def task(func=None, *, name=None, max_attempts=3, priority=0):
+    """Регистрирует задачу под именем ``<модуль>.<функция>``."""
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = Task(func, task_name, max_attempts, priority)
+        return registry[task_name]
+    return decorator if func is None else decorator(func)
+
+
+def dispatch(job):
+    """Передает готовую задачу исполнителю из TASKS_EXECUTOR.
+
+    ``database`` оставляет ее воркерам ``run_workers``, ``thread``
+    выполняет в пуле потоков процесса после коммита, ``immediate`` —
+    сразу, внутри вызова. Задача в любом случае записана в таблицу,
+    так что упавший поток доработают воркеры.
+    """
+    executor = settings.TASKS_EXECUTOR
+    if executor == 'immediate':
+        claimed = claim(job.pk)
+        if claimed is not None:
+            run(claimed)
+    elif executor == 'thread':
+        transaction.on_commit(
+            lambda: _thread_pool().submit(_run_in_thread, job.pk))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _thread_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                settings.TASKS_THREADS, thread_name_prefix='tasks')
+        return _pool
+
+
+def _run_in_thread(job_id):
+    try:
+        job = claim(job_id)
+        if job is not None:
+            run(job)
+    finally:
+        connection.close()
+
+
+def _claim(job_id, now, **state):
+    if not Job.objects.filter(pk=job_id, **state).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1):
+        return None
+    return Job.objects.get(pk=job_id)
+
+
+def claim(job_id):
+    """Берет в работу конкретную задачу, если ее еще никто не взял."""
+    now = timezone.now()
+    return _claim(job_id, now, status=Job.QUEUED, run_at__lte=now)
+
+
+def claim_next():
+    """Берет в работу следующую готовую задачу или None.
+
+    Захват — условный UPDATE по прежнему состоянию строки, поэтому
+    конкурирующие процессы не возьмут одну задачу дважды на любой БД.
+    Задачи, которые висят в работе дольше TASKS_JOB_TIMEOUT, считаются
+    брошенными упавшим воркером и выдаются снова, пока не исчерпан
+    предел попыток; после него они помечаются FAILED, чтобы задача,
+    роняющая воркер, не перезапускалась вечно.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_JOB_TIMEOUT)
+    Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=stale,
+        attempts__gte=F('max_attempts'),
+    ).update(
+        status=Job.FAILED, locked_at=None,
+        last_error=WORKER_LOST)
+    candidates = Job.objects.filter(
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale,
+            attempts__lt=F('max_attempts'))
+    ).order_by('-priority', 'run_at', 'pk').values_list(
+        'pk', 'status', 'locked_at')
+    for job_id, status, locked_at in candidates[:10]:
+        job = _claim(job_id, now, status=status, locked_at=locked_at)
+        if job is not None:
+            return job
+    return None
+
+
+def run(job):
+    """Выполняет взятую задачу: удаляет ее или планирует повтор."""
+    task = registry.get(job.name)
+    try:
+        if task is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована.')
+        payload = json.loads(job.payload)
+        task.func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        logger.exception('Задача %s упала на попытке %s', job, job.attempts)
+        job.last_error = traceback.format_exc()
+        job.locked_at = None
+        if task is not None and job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=settings.TASKS_RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = Job.FAILED
+        job.save(update_fields=('status', 'run_at', 'locked_at', 'last_error'))
+        return False
+    job.delete()
+    return True
+
+
+def run_pending(stop=None):
+    """Выполняет готовые задачи, пока они есть; возвращает их число."""
+    count = 0
+    while stop is None or not stop.is_set():
+        job = claim_next()
+        if job is None:
+            break
+        run(job)
+        count += 1
+    return count
@@ -0,0 +1,146 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Job
+from tasks.queue import claim_next, run_pending, task
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.flaky', max_attempts=2)
+def flaky():
+    calls.append('flaky')
+    raise RuntimeError('flaky')
+
+
+@override_settings(TASKS_EXECUTOR='database', TASKS_RETRY_DELAY=60)
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_defers_to_workers(self):
+        """При database задача только записывается в таблицу."""
+        record.delay('value')
+
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['value'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_priority_order(self):
+        """Задачи с большим приоритетом выполняются раньше."""
+        record.enqueue(['low'])
+        record.enqueue(['high'], priority=5)
+        run_pending()
+
+        self.assertEqual(calls, ['high', 'low'])
+
+    def test_countdown(self):
+        """Отложенная задача не выполняется раньше срока."""
+        job = record.enqueue(['later'], countdown=60)
+
+        self.assertEqual(run_pending(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['later'])
+
+    def test_retries_then_fails(self):
+        """Упавшая задача повторяется с задержкой до предела попыток."""
+        job = flaky.delay()
+        with self.assertLogs('yatube.tasks'):
+            run_pending()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('yatube.tasks'):
+            run_pending()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(calls, ['flaky', 'flaky'])
+
+    def test_job_claimed_once(self):
+        """Взятую задачу не выдают повторно, пока она не зависла."""
+        record.delay('value')
+        job = claim_next()
+
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertIsNone(claim_next())
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim_next().pk, job.pk)
+
+    def test_stale_job_fails_after_max_attempts(self):
+        """Зависшая задача без оставшихся попыток помечается FAILED."""
+        job = flaky.delay()
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=job.max_attempts,
+            locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertIsNone(claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(job.locked_at)
+        self.assertTrue(job.last_error)
+
+    def test_run_workers_burst(self):
+        """run_workers --burst выполняет очередь и завершается."""
+        record.delay('first')
+        record.delay('second')
+        call_command(
+            'run_workers', processes=1, burst=True, stdout=StringIO())
+
+        self.assertEqual(sorted(calls), ['first', 'second'])
+
+    @override_settings(TASKS_EXECUTOR='immediate')
+    def test_immediate_executor(self):
+        """immediate выполняет задачу внутри вызова."""
+        record.delay('now')
+
+        self.assertEqual(calls, ['now'])
+
+    @override_settings(TASKS_EXECUTOR='immediate')
+    def test_password_reset_mail_queued(self):
+        """Письмо сброса пароля отправляет задача."""
+        from django.contrib.auth import get_user_model
+
+        get_user_model().objects.create_user(
+            username='Leo', email='leo@example.com', password='password')
+        self.client.post(
+            '/auth/password_reset/', {'email': 'leo@example.com'})
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['leo@example.com'])
+
+    def test_password_reset_payload_has_no_token(self):
+        """В задаче сброса пароля нет токена, он создается при отправке."""
+        from django.contrib.auth import get_user_model
+
+        user = get_user_model().objects.create_user(
+            username='Leo', email='leo@example.com', password='password')
+        self.client.post(
+            '/auth/password_reset/', {'email': 'leo@example.com'})
+        payload = json.loads(Job.objects.get().payload)
+
+        self.assertEqual(payload['args'][0], user.pk)
+        self.assertNotIn('token', payload['args'][1])
+        self.assertNotIn('/reset/', Job.objects.get().payload)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('/reset/', mail.outbox[0].body)
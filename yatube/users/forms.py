@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+
+from users.jobs import send_password_reset
 
 User = get_user_model()
 
@@ -8,3 +10,23 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо сброса пароля отправляет фоновая задача.
+
+    В задачу передается только id пользователя: токен и ссылка
+    создаются и рендерятся уже в ней.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        public_context = {
+            key: value for key, value in context.items()
+            if key not in ('user', 'uid', 'token')
+        }
+        send_password_reset.delay(
+            context['user'].pk, public_context, subject_template_name,
+            email_template_name, from_email, to_email,
+            html_email_template_name)
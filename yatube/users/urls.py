@@ -3,6 +3,7 @@ from django.contrib.auth.views import (LogoutView, PasswordResetDoneView,
 from django.urls import path
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -19,6 +20,7 @@ urlpatterns = [
     path(
         'password_reset/',
         PasswordResetView.as_view(
+            form_class=QueuedPasswordResetForm,
             template_name='users/password_reset_form.html'),
         name='password_reset_form'),
     path(
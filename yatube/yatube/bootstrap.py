@@ -0,0 +1,144 @@
+"""WSGI-приложение для продакшена с подготовкой до fork.
+
+Вся работа первого запроса — импорт приложений, разбор URL, компиляция
+шаблонов — выполняется в мастер-процессе, после чего объекты
+замораживаются ``gc.freeze()``, чтобы сборщик мусора не трогал их
+страницы памяти в воркерах. Запуск через gunicorn::
+
+    gunicorn --preload -c python:yatube.bootstrap yatube.bootstrap
+
+Хуки ``post_fork`` и ``worker_exit`` пишут в журнал память воркера.
+Поток новых постов (POST_STREAM_ENABLED) держит воркер все время
+соединения, поэтому с ним нужны потоковые воркеры::
+
+    gunicorn --preload --worker-class gthread --threads 16 \\
+        -c python:yatube.bootstrap yatube.bootstrap
+"""
+import gc
+import logging
+import os
+from time import perf_counter
+
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+from django.urls import URLResolver, get_resolver
+from django.utils.module_loading import autodiscover_modules
+
+from core.profiling import memory_usage
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+logger = logging.getLogger('yatube.bootstrap')
+
+PRELOAD_MODULES = ('models', 'views', 'urls', 'forms', 'admin', 'signals')
+
+
+def import_apps():
+    autodiscover_modules(*PRELOAD_MODULES)
+
+
+def resolve_urls():
+    """Компилирует регулярные выражения всех URL; возвращает их число."""
+    def walk(patterns):
+        count = 0
+        for pattern in patterns:
+            pattern.pattern.regex
+            if isinstance(pattern, URLResolver):
+                count += walk(pattern.url_patterns)
+            else:
+                count += 1
+        return count
+
+    resolver = get_resolver()
+    resolver.reverse_dict, resolver.namespace_dict, resolver.app_dict
+    return walk(resolver.url_patterns)
+
+
+def template_names(engine):
+    dirs = list(engine.dirs)
+    if engine.app_dirs:
+        dirs.extend(get_app_template_dirs('templates'))
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(('.html', '.txt')):
+                    yield os.path.relpath(
+                        os.path.join(root, name), directory).replace(
+                            os.sep, '/')
+
+
+def compile_templates():
+    """Загружает все шаблоны через cached loader; возвращает их число.
+
+    При DEBUG = True Django не включает cached loader, и шаг лишь
+    проверяет, что шаблоны компилируются.
+    """
+    count = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        engine.template_libraries
+        for name in set(template_names(engine)):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                logger.warning('Шаблон %s не скомпилирован: %s', name, error)
+            else:
+                count += 1
+    return count
+
+
+def close_connections():
+    connections.close_all()
+
+
+def freeze():
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+STEPS = (
+    ('import_apps', import_apps),
+    ('resolve_urls', resolve_urls),
+    ('compile_templates', compile_templates),
+    ('close_connections', close_connections),
+    ('gc_freeze', freeze),
+)
+
+
+def preload():
+    """Выполняет шаги подготовки; возвращает [(шаг, секунды, итог)]."""
+    timings = []
+    for name, step in STEPS:
+        start = perf_counter()
+        result = step()
+        timings.append((name, perf_counter() - start, result))
+        logger.info(
+            'bootstrap %s: %.1f ms, %s', name, timings[-1][1] * 1000, result)
+    return timings
+
+
+def log_memory(label):
+    usage = memory_usage()
+    logger.info('%s pid=%s %s', label, os.getpid(), ' '.join(
+        f'{key}={value}kB' for key, value in usage.items()))
+    return usage
+
+
+def post_fork(server, worker):
+    log_memory('worker started')
+
+
+def worker_exit(server, worker):
+    log_memory('worker exiting')
+
+
+_start = perf_counter()
+application = get_wsgi_application()
+startup_timings = [('get_wsgi_application', perf_counter() - _start, None)]
+startup_timings.extend(preload())
+log_memory('master ready')
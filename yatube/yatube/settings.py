@@ -1,4 +1,5 @@
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,28 +26,39 @@ INSTALLED_APPS = [
     'users',
     'core',
     'about',
+    'tasks',
+    'api',
 
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
+    'core.middleware.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'posts.middleware.FollowMiddleware',
+    'core.middleware.FragmentMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TracingViewMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backend.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
+            'profiling': False,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -96,6 +108,17 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# В продакшене collectstatic добавляет хэш в имена и сжатые копии.
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Ответы короче COMPRESS_MIN_SIZE байт не сжимаются.
+COMPRESS_MIN_SIZE = 512
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5
+
 POSTS_PER_PAGE = 10
 
 LOGIN_URL = 'users:login'
@@ -109,8 +132,135 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Загруженные файлы не меняются под тем же именем, их можно кэшировать
+# надолго.
+MEDIA_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+# Кто отдает тело медиафайла: None — сам WSGI-сервер (sendfile через
+# file_wrapper), 'x-accel' — nginx по X-Accel-Redirect на
+# MEDIA_ACCEL_PREFIX, 'x-sendfile' — Apache/lighttpd по X-Sendfile.
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Ограничения картинок к постам: проверяются при приеме файла, до его
+# записи целиком.
+POST_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 25 * 1000 * 1000
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Готовые HTML-страницы из manage.py prerender для раздачи веб-сервером.
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_BYTES': 32 * 1024 * 1024,
+            'LOCAL_TIMEOUT': 5,
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache_backends.DatabaseCache',
+        'LOCATION': 'django_cache',
+    },
+}
+
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.jsonl')
+
+# manage.py test и pytest не трассируют запросы: иначе тесты пишут в
+# рабочий журнал TRACE_LOG. Тесты трассировки включают ее сами.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+TRACE_SAMPLE_RATE = 0 if TESTING else 0.01
+TRACE_LOG = os.path.join(BASE_DIR, 'traces.jsonl')
+
+THUMBNAIL_BACKEND = 'core.thumbnail.TracingThumbnailBackend'
+
+# Исполнитель фоновых задач: database — только воркеры run_workers,
+# thread — еще и пул потоков процесса, immediate — сразу в запросе.
+# Потоки пишут в БД параллельно с запросами, что SQLite выдерживает
+# плохо, поэтому по умолчанию задачи выполняют отдельные воркеры.
+TASKS_EXECUTOR = 'database'
+TASKS_THREADS = 2
+TASKS_PROCESSES = 2
+TASKS_RETRY_DELAY = 10
+TASKS_JOB_TIMEOUT = 10 * 60
+
+# Уведомления о новых постах копятся и уходят дайджестом не чаще раза
+# в NOTIFICATION_DIGEST_INTERVAL секунд; писем на одно SMTP-соединение —
+# NOTIFICATION_DIGEST_BATCH.
+NOTIFICATION_DIGEST_INTERVAL = 60 * 60
+NOTIFICATION_DIGEST_BATCH = 100
+
+# Поток новых постов /stream/: период проверки метки в кэше,
+# интервал keepalive-комментариев и время жизни одного соединения.
+# Соединение занимает воркер целиком, поэтому поток включается только
+# с воркерами gunicorn gthread или gevent, а время жизни держится меньше
+# их --timeout (30 секунд по умолчанию). Сверх MAX_CONNECTIONS потоков
+# на процесс клиент получает 503 и переподключается через BUSY_RETRY
+# секунд.
+POST_STREAM_ENABLED = False
+POST_STREAM_POLL_INTERVAL = 1
+POST_STREAM_KEEPALIVE = 15
+POST_STREAM_DURATION = 25
+POST_STREAM_MAX_CONNECTIONS = 10
+POST_STREAM_BUSY_RETRY = 30
+
+# Прогревать кэш страниц командой warm_cache при старте WSGI-процесса.
+WARM_CACHE_ON_STARTUP = False
+
+# True, если персональные фрагменты страниц подставляет прокси через SSI.
+EDGE_SIDE_INCLUDES = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'raw': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'raw',
+        },
+        'traces': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': TRACE_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'raw',
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'yatube.traces': {
+            'handlers': ['traces'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'yatube.bootstrap': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'yatube.tasks': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
@@ -1,7 +1,14 @@
 import os
+import threading
 
+from django.conf import settings
+from django.core.management import call_command
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.WARM_CACHE_ON_STARTUP:
+    threading.Thread(
+        target=call_command, args=('warm_cache',), daemon=True).start()